@@ -1,3 +1,4 @@
+import math
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.patches import Circle as pltCircle
@@ -10,28 +11,105 @@ class Circle:
         self.radius = radius
         self.center = (x, y)
 
+    ##Porównanie kwadratów odległości - bez pierwiastkowania
     def intersects(self, other_circle):
-        distance = np.sqrt(
-            (self.x - other_circle.x) ** 2 + (self.y - other_circle.y) ** 2
-        )
-        return distance < self.radius + other_circle.radius
+        dx = self.x - other_circle.x
+        dy = self.y - other_circle.y
+        reach = self.radius + other_circle.radius
+        return dx * dx + dy * dy < reach * reach
+
+## Siatka przestrzenna - środki kół trafiają do kwadratowych komórek o boku równym największej średnicy,
+## więc dwa przecinające się koła zawsze leżą w tej samej albo w sąsiedniej komórce
+class SpatialGrid:
+    HALF_NEIGHBORHOOD = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size if cell_size > 0 else 1.0
+        self.cells = {}
+
+    def cell_of(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, key, x, y):
+        self.cells.setdefault(self.cell_of(x, y), []).append(key)
 
 ## Klasa grafu kołowego, przechowuje listę kół, listę sąsiedztwa oraz metody tworzące listę sąsiedztwa, zapisujące graf do pliku oraz odczytujące graf z pliku
 class CircleGraph:
-    def __init__(self, circles):
+    ##Dostępne silniki: pełne porównanie par, siatka przestrzenna, zamiatanie po osi X
+    ENGINES = ("naive", "grid", "sweep")
+
+    def __init__(self, circles, engine="grid"):
         self.circles = circles
+        self.engine = engine
         self.adjacency_list = self.create_adjacency_list()
 
-    ##Tworzenie listy sąsiedztw
-    def create_adjacency_list(self):
+    ##Tworzenie listy sąsiedztw wybranym silnikiem
+    def create_adjacency_list(self, engine=None):
+        engine = engine or self.engine
+        if engine == "naive":
+            pairs = self._pairs_naive()
+        elif engine == "grid":
+            pairs = self._pairs_grid()
+        elif engine == "sweep":
+            pairs = self._pairs_sweep()
+        else:
+            raise ValueError(f"Nieznany silnik {engine}, dostępne: {', '.join(self.ENGINES)}")
         adjacency_list = {i: [] for i in range(len(self.circles))}
+        for i, j in pairs:
+            adjacency_list[i].append(j)
+            adjacency_list[j].append(i)
+        for neighbors in adjacency_list.values():
+            neighbors.sort()
+        return adjacency_list
 
+    def _pairs_naive(self):
+        pairs = []
         for i in range(len(self.circles)):
             for j in range(i + 1, len(self.circles)):
                 if self.circles[i].intersects(self.circles[j]):
-                    adjacency_list[i].append(j)
-                    adjacency_list[j].append(i)
-        return adjacency_list
+                    pairs.append((i, j))
+        return pairs
+
+    ##Porównanie tylko kół z tej samej lub sąsiedniej komórki siatki
+    def _pairs_grid(self):
+        pairs = []
+        circles = self.circles
+        if not circles:
+            return pairs
+        grid = SpatialGrid(2 * max(circle.radius for circle in circles))
+        for i, circle in enumerate(circles):
+            grid.insert(i, circle.x, circle.y)
+        for (cx, cy), bucket in grid.cells.items():
+            for position, i in enumerate(bucket):
+                for j in bucket[position + 1:]:
+                    if circles[i].intersects(circles[j]):
+                        pairs.append((i, j))
+            for dx, dy in SpatialGrid.HALF_NEIGHBORHOOD:
+                other_bucket = grid.cells.get((cx + dx, cy + dy))
+                if not other_bucket:
+                    continue
+                for i in bucket:
+                    for j in other_bucket:
+                        if circles[i].intersects(circles[j]):
+                            pairs.append((i, j))
+        return pairs
+
+    ##Zamiatanie po osi X - porównanie tylko kół, których prostokąty ograniczające nachodzą na siebie
+    def _pairs_sweep(self):
+        pairs = []
+        circles = self.circles
+        order = sorted(range(len(circles)), key=lambda i: circles[i].x - circles[i].radius)
+        for position, i in enumerate(order):
+            circle = circles[i]
+            right_edge = circle.x + circle.radius
+            for next_position in range(position + 1, len(order)):
+                j = order[next_position]
+                other_circle = circles[j]
+                if other_circle.x - other_circle.radius >= right_edge:
+                    break
+                if abs(circle.y - other_circle.y) < circle.radius + other_circle.radius and circle.intersects(other_circle):
+                    pairs.append((i, j))
+        return pairs
 
     ##Zapisywanie grafu do pliku z możliwością dodania komentarza
     def write_to_file(self, filename):
@@ -49,7 +127,7 @@ class CircleGraph:
 
     ##Odczytanie grafu z pliku
     @classmethod
-    def read_from_file(cls, filename):
+    def read_from_file(cls, filename, engine="grid"):
         circles = []
         with open(filename, "r") as f:
             for line in f:
@@ -57,7 +135,7 @@ class CircleGraph:
                     continue
                 x, y, radius = map(float, line.strip().split())
                 circles.append(Circle(x, y, radius))
-        return cls(circles)
+        return cls(circles, engine)
 
     ##Dodanie nowego koła do grafu
     def add_circle(self, circle):
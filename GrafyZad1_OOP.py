@@ -1,42 +1,674 @@
+import argparse
+import bisect
+import cProfile
+import functools
+import glob
+import inspect
+import json
+import math
+import multiprocessing
+import os
+import platform
+import re
+import struct
+import sys
+import tempfile
+import threading
+import tracemalloc
+import warnings
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import datetime
+from functools import cached_property
+from statistics import mean, median, pstdev
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Circle as pltCircle
-from time import time
+from time import perf_counter, process_time
 
 # Klasa koła, przechouje id koła, współrzędne x, y, promień oraz metodę sprawdzającą czy dwa koła się przecinają
+# Obiekty bez __dict__ (__slots__), środek wyliczany na żądanie. Koła porównywane są po wartościach,
+# bo graf kołowy trzyma współrzędne w magazynie kolumnowym i odtwarza z niego obiekty przy odczycie
 class Circle:
+    __slots__ = ("id", "x", "y", "radius")
+
     def __init__(self, circle_Id, x, y, radius):
         self.id = circle_Id
         self.x = x
         self.y = y
         self.radius = radius
-        self.center = (x, y)
 
+    @property
+    def center(self):
+        return (self.x, self.y)
+
+    def __eq__(self, other_circle):
+        if not isinstance(other_circle, Circle):
+            return NotImplemented
+        return (self.id, self.x, self.y, self.radius) == (other_circle.id, other_circle.x, other_circle.y,
+                                                          other_circle.radius)
+
+    def __hash__(self):
+        return hash((self.id, self.x, self.y, self.radius))
+
+    # Porównanie kwadratów odległości - bez pierwiastkowania
     def intersects(self, other_circle):
-        distance = np.sqrt(
-            (self.x - other_circle.x) ** 2 + (self.y - other_circle.y) ** 2
-        )
-        return distance < self.radius + other_circle.radius
+        dx = self.x - other_circle.x
+        dy = self.y - other_circle.y
+        reach = self.radius + other_circle.radius
+        return dx * dx + dy * dy < reach * reach
 
     def __str__(self):
         return f"Circle ID: {self.id}, center: ({self.x}, {self.y}), radius: {self.radius}"
 
-# Klasa grafu kołowego, przechowuje listę kół, listę sąsiedztwa oraz metody tworzące listę sąsiedztwa, zapisujące graf do pliku oraz odczytujące graf z pliku
+# Siatka przestrzenna - środki kół trafiają do kwadratowych komórek o boku równym największej średnicy,
+# więc dwa przecinające się koła zawsze leżą w tej samej albo w sąsiedniej komórce
+class SpatialGrid:
+    # Połowa otoczenia komórki - każda para sąsiednich komórek jest odwiedzana tylko raz
+    HALF_NEIGHBORHOOD = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size if cell_size > 0 else 1.0
+        self.cells = {}
+
+    def cell_of(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, key, x, y):
+        self.cells.setdefault(self.cell_of(x, y), []).append(key)
+
+    def remove(self, key, x, y):
+        cell = self.cell_of(x, y)
+        bucket = self.cells.get(cell)
+        if bucket and key in bucket:
+            bucket.remove(key)
+            if not bucket:
+                del self.cells[cell]
+
+    # Kandydaci z komórki punktu i ośmiu komórek sąsiednich
+    def nearby(self, x, y):
+        cx, cy = self.cell_of(x, y)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                yield from self.cells.get((cx + dx, cy + dy), ())
+
+    # Kandydaci z komórek nachodzących na prostokąt; przy prostokącie większym niż zajęta część siatki
+    # przeglądane są tylko niepuste komórki
+    def in_box(self, xmin, ymin, xmax, ymax):
+        cx_min, cy_min = self.cell_of(xmin, ymin)
+        cx_max, cy_max = self.cell_of(xmax, ymax)
+        if (cx_max - cx_min + 1) * (cy_max - cy_min + 1) > len(self.cells):
+            for (cx, cy), bucket in self.cells.items():
+                if cx_min <= cx <= cx_max and cy_min <= cy <= cy_max:
+                    yield from bucket
+            return
+        for cx in range(cx_min, cx_max + 1):
+            for cy in range(cy_min, cy_max + 1):
+                yield from self.cells.get((cx, cy), ())
+
+# Kolumnowy magazyn kół - współrzędne x, y i promienie w ciągłych tablicach float64
+class CircleStore:
+    # Domyślny bok kafla, pamięć jądra rośnie z kwadratem kafla, a nie z liczbą kół
+    TILE_SIZE = 1024
+    # Kandydaci na pary w jądrze siatkowym (cell_pairs) generowani porcjami po PAIR_CHUNK_SIZE
+    PAIR_CHUNK_SIZE = 1 << 22
+    # Liczba pasów na proces przy równoległym wyszukiwaniu przecięć
+    STRIPS_PER_PROCESS = 4
+    # Pliki tekstowe czytane blokami po TEXT_CHUNK_SIZE bajtów i zapisywane porcjami po TEXT_WRITE_ROWS wierszy
+    TEXT_CHUNK_SIZE = 1 << 24
+    TEXT_WRITE_ROWS = 1 << 16
+    # Plik binarny: nagłówek (magia, wersja, flagi, liczba kół), potem kolumny ids, x, y, radius jako float64 LE
+    BINARY_MAGIC = b"GRAFCIR\0"
+    BINARY_VERSION = 1
+    BINARY_HEADER = struct.Struct("<8sIIQ")
+    BINARY_EXTENSION = ".gcir"
+
+    def __init__(self, x, y, radius, ids=None):
+        self.x = np.ascontiguousarray(x, dtype=np.float64)
+        self.y = np.ascontiguousarray(y, dtype=np.float64)
+        self.radius = np.ascontiguousarray(radius, dtype=np.float64)
+        self.ids = np.ascontiguousarray(np.arange(len(self.x)) if ids is None else ids, dtype=np.float64)
+        self._buffers = None
+
+    @classmethod
+    def from_circles(cls, circles):
+        return cls([circle.x for circle in circles],
+                   [circle.y for circle in circles],
+                   [circle.radius for circle in circles],
+                   [circle.id for circle in circles])
+
+    def __len__(self):
+        return len(self.x)
+
+    # Dopisanie koła na końcu, zwraca jego klucz (numer wiersza). Kolumny rosną przez podwajanie pojemności
+    # bufora, a x, y, radius i ids są widokami jego zajętej części
+    def append(self, circle_id, x, y, radius):
+        count = len(self.x)
+        if self._buffers is None or count == len(self._buffers[0]):
+            buffers = tuple(np.empty(max(16, 2 * count), dtype=np.float64) for _ in range(4))
+            for buffer, column in zip(buffers, (self.ids, self.x, self.y, self.radius)):
+                buffer[:count] = column
+            self._buffers = buffers
+        for buffer, value in zip(self._buffers, (circle_id, x, y, radius)):
+            buffer[count] = value
+        self.ids, self.x, self.y, self.radius = (buffer[:count + 1] for buffer in self._buffers)
+        return count
+
+    # Wybrane wiersze jako nowy, zwarty magazyn
+    def take(self, keys):
+        return CircleStore(self.x[keys], self.y[keys], self.radius[keys], self.ids[keys])
+
+    # Kolumna ids jest float64, ale identyfikatory całkowite wracają jako int, jak przed przejściem na magazyn
+    def circle(self, key):
+        circle_id = float(self.ids[key])
+        return Circle(int(circle_id) if circle_id.is_integer() else circle_id, float(self.x[key]), float(self.y[key]),
+                      float(self.radius[key]))
+
+    @classmethod
+    def concatenate(cls, stores):
+        stores = list(stores)
+        if not stores:
+            return cls([], [], [])
+        return cls(*(np.concatenate([getattr(store, column) for store in stores])
+                     for column in ("x", "y", "radius", "ids")))
+
+    # Koła z pliku tekstowego (wiersze: Id X Y Rad, komentarze od #) blok po bloku - w pamięci jest
+    # jeden blok pełnych linii i kolumny już wczytanych kół, bez obiektów Circle
+    @classmethod
+    def iter_text_chunks(cls, filename, chunk_size=None):
+        for values in iter_number_blocks(filename, 4, np.float64, chunk_size or cls.TEXT_CHUNK_SIZE):
+            yield cls(values[:, 1], values[:, 2], values[:, 3], values[:, 0])
+
+    @classmethod
+    def read_text_file(cls, filename, chunk_size=None):
+        return cls.concatenate(cls.iter_text_chunks(filename, chunk_size))
+
+    # Zapis tekstowy porcjami wierszy - format liczb jak przy str(float), więc odczyt zwraca te same wartości
+    def write_text_file(self, filename, comment=None):
+        with open(filename, "w") as file:
+            if comment is not None:
+                file.write(f"#{comment}\n")
+            file.write("#Id X Y Rad\n")
+            for start in range(0, len(self), self.TEXT_WRITE_ROWS):
+                end = start + self.TEXT_WRITE_ROWS
+                file.write("".join(map("%r %r %r %r\n".__mod__, zip(self.ids[start:end].tolist(), self.x[start:end].tolist(),
+                                                                   self.y[start:end].tolist(), self.radius[start:end].tolist()))))
+
+    def write_binary_file(self, filename):
+        with open(filename, "wb") as file:
+            file.write(self.BINARY_HEADER.pack(self.BINARY_MAGIC, self.BINARY_VERSION, 0, len(self)))
+            for column in (self.ids, self.x, self.y, self.radius):
+                file.write(np.ascontiguousarray(column, dtype="<f8").tobytes())
+
+    # Odczyt binarnego pliku kół. Przy mmap=True kolumny są widokami na plik zmapowany w pamięci, a pierwsze
+    # dopisanie koła (append) kopiuje je do własnych buforów, więc plik nigdy nie jest modyfikowany
+    @classmethod
+    def read_binary_file(cls, filename, mmap=True):
+        if mmap:
+            data = np.memmap(filename, dtype=np.uint8, mode="r")
+        else:
+            data = np.fromfile(filename, dtype=np.uint8)
+        header_size = cls.BINARY_HEADER.size
+        if len(data) < header_size:
+            raise ValueError(f"Plik {filename} jest za krótki na nagłówek pliku kół.")
+        magic, version, _, count = cls.BINARY_HEADER.unpack(data[:header_size].tobytes())
+        if magic != cls.BINARY_MAGIC:
+            raise ValueError(f"Plik {filename} nie jest binarnym plikiem kół.")
+        if version != cls.BINARY_VERSION:
+            raise ValueError(f"Nieobsługiwana wersja pliku kół: {version}.")
+        if len(data) < header_size + 4 * 8 * count:
+            raise ValueError(f"Plik {filename} jest uszkodzony - brakuje danych kół.")
+        ids, x, y, radius = (data[header_size + 8 * count * column:header_size + 8 * count * (column + 1)].view("<f8")
+                             for column in range(4))
+        return cls(x, y, radius, ids)
+
+    # Rozszerzenie .gcir oznacza plik binarny, każde inne - tekstowy
+    @classmethod
+    def read_file(cls, filename, chunk_size=None, mmap=True):
+        if os.path.splitext(filename)[1].lower() == cls.BINARY_EXTENSION:
+            return cls.read_binary_file(filename, mmap)
+        return cls.read_text_file(filename, chunk_size)
+
+    def write_file(self, filename, comment=None):
+        if os.path.splitext(filename)[1].lower() == self.BINARY_EXTENSION:
+            self.write_binary_file(filename)
+        else:
+            self.write_text_file(filename, comment)
+
+    # Konwersja pliku tekstowego na binarny, domyślnie obok źródła z rozszerzeniem .gcir
+    @classmethod
+    def convert_text_file(cls, text_filename, binary_filename=None, chunk_size=None):
+        binary_filename = binary_filename or os.path.splitext(text_filename)[0] + cls.BINARY_EXTENSION
+        cls.read_text_file(text_filename, chunk_size).write_binary_file(binary_filename)
+        return binary_filename
+
+    # Jądro blokowe - porównuje kafel kół [a_start:a_end] z kaflem [b_start:b_end] jedną operacją NumPy,
+    # porównując kwadraty odległości, bez pierwiastkowania
+    def intersect_tile(self, a_start, a_end, b_start, b_end):
+        dx = np.subtract.outer(self.x[a_start:a_end], self.x[b_start:b_end])
+        dy = np.subtract.outer(self.y[a_start:a_end], self.y[b_start:b_end])
+        reach = np.add.outer(self.radius[a_start:a_end], self.radius[b_start:b_end])
+        np.multiply(dx, dx, out=dx)
+        np.multiply(dy, dy, out=dy)
+        np.add(dx, dy, out=dx)
+        np.multiply(reach, reach, out=reach)
+        return dx < reach
+
+    # Wszystkie pary przecinających się kół jako dwie tablice indeksów.
+    # Koła są sortowane po lewej krawędzi, więc kafle, których zakresy X się nie nakładają, są pomijane
+    def intersecting_pairs(self, tile_size=None):
+        tile_size = tile_size or self.TILE_SIZE
+        count = len(self)
+        order = np.argsort(self.x - self.radius, kind="stable")
+        ordered = CircleStore(self.x[order], self.y[order], self.radius[order])
+        left_edges = ordered.x - ordered.radius
+        right_edges = ordered.x + ordered.radius
+        first_parts, second_parts = [], []
+        for a_start in range(0, count, tile_size):
+            a_end = min(a_start + tile_size, count)
+            tile_right = right_edges[a_start:a_end].max()
+            for b_start in range(a_start, count, tile_size):
+                if left_edges[b_start] >= tile_right:
+                    break
+                b_end = min(b_start + tile_size, count)
+                mask = ordered.intersect_tile(a_start, a_end, b_start, b_end)
+                if a_start == b_start:
+                    mask = np.triu(mask, 1)
+                first, second = np.nonzero(mask)
+                if len(first):
+                    first_parts.append(first + a_start)
+                    second_parts.append(second + b_start)
+        if not first_parts:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        return order[np.concatenate(first_parts)], order[np.concatenate(second_parts)]
+
+    # Siatka na tablicach - koła sortowane według komórki o boku cell_size (domyślnie największa średnica),
+    # kandydatami są dalsze koła z tej samej komórki i wszystkie koła z komórek połowy sąsiedztwa.
+    # Zwraca pary indeksów jak intersecting_pairs, każda para występuje raz
+    def cell_pairs(self, cell_size=None):
+        count = len(self)
+        if count < 2:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        cell_size = cell_size or 2 * float(self.radius.max()) or 1.0
+        cell_x = np.floor(self.x / cell_size).astype(np.int64)
+        cell_y = np.floor(self.y / cell_size).astype(np.int64)
+        cell_x -= cell_x.min()
+        cell_y -= cell_y.min()
+        # Wysokość z zapasem jednej komórki, więc sąsiad (cx + 1, cy - 1) przy cy = 0 trafia w pustą komórkę
+        height = int(cell_y.max()) + 2
+        if (int(cell_x.max()) + 2) * height >= 1 << 62:
+            return self.intersecting_pairs()
+        keys = cell_x * height + cell_y
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        x, y, radius = self.x[order], self.y[order], self.radius[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], count]
+        cell_keys = keys[starts]
+        cell_of = np.repeat(np.arange(len(starts)), ends - starts)
+        positions = np.arange(count)
+        partner_starts = [positions + 1]
+        partner_counts = [ends[cell_of] - positions - 1]
+        for dx, dy in SpatialGrid.HALF_NEIGHBORHOOD:
+            wanted = cell_keys + dx * height + dy
+            index = np.minimum(np.searchsorted(cell_keys, wanted), len(cell_keys) - 1)
+            found = cell_keys[index] == wanted
+            partner_starts.append(np.where(found, starts[index], 0)[cell_of])
+            partner_counts.append(np.where(found, ends[index] - starts[index], 0)[cell_of])
+        partner_starts = np.stack(partner_starts)
+        partner_counts = np.stack(partner_counts)
+        totals = partner_counts.sum(axis=0)
+        windows = (np.cumsum(totals) - totals) // self.PAIR_CHUNK_SIZE
+        bounds = [0, *(np.flatnonzero(np.diff(windows)) + 1).tolist(), count]
+        first_parts, second_parts = [], []
+        for start, end in zip(bounds, bounds[1:]):
+            counts = partner_counts[:, start:end].ravel()
+            first = np.repeat(np.tile(positions[start:end], len(partner_starts)), counts)
+            offsets = np.cumsum(counts) - counts
+            second = np.repeat(partner_starts[:, start:end].ravel() - offsets, counts) + np.arange(len(first))
+            dx = x[first] - x[second]
+            dy = y[first] - y[second]
+            reach = radius[first] + radius[second]
+            hit = dx * dx + dy * dy < reach * reach
+            first_parts.append(order[first[hit]])
+            second_parts.append(order[second[hit]])
+        return np.concatenate(first_parts), np.concatenate(second_parts)
+
+    # Równoległe wyszukiwanie przecięć. Koła sortowane po X dzielone są na pasy o równej liczbie kół;
+    # każdy pas liczony jest w procesie roboczym razem z marginesem szerokości największej średnicy
+    # (środki przecinających się kół są bliżej niż dwa największe promienie). Parę zgłasza tylko pas,
+    # do którego należy jej koło o mniejszej pozycji, więc wyniki pasów łączone są bez powtórzeń
+    def parallel_pairs(self, processes=None, strips=None):
+        processes = processes or os.cpu_count() or 1
+        count = len(self)
+        # Proces roboczy innej puli (np. trybu wsadowego) nie może tworzyć własnych procesów
+        if processes == 1 or count < 2 or multiprocessing.current_process().daemon:
+            return self.cell_pairs()
+        order = np.argsort(self.x, kind="stable")
+        ordered = self.take(order)
+        margin = 2 * float(ordered.radius.max()) or 1.0
+        strips = strips or processes * self.STRIPS_PER_PROCESS
+        bounds = np.unique(np.linspace(0, count, strips + 1).astype(np.int64)).tolist()
+        tasks = []
+        for start, end in zip(bounds, bounds[1:]):
+            low = int(np.searchsorted(ordered.x, ordered.x[start] - margin, "left"))
+            high = int(np.searchsorted(ordered.x, ordered.x[end - 1] + margin, "right"))
+            tasks.append((low, high, start, end))
+        with worker_pool(min(processes, len(tasks)), CircleStore._strip_task, (ordered, margin)) as pool:
+            results = list(pool.imap_unordered(_worker_task, tasks))
+        first = np.concatenate([result[0] for result in results])
+        second = np.concatenate([result[1] for result in results])
+        return order[first], order[second]
+
+    # Zadanie procesu roboczego parallel_pairs - stan to koła posortowane po X i bok komórki siatki
+    @staticmethod
+    def _strip_task(state, task):
+        store, cell_size = state
+        return store.strip_pairs(*task, cell_size)
+
+    # Pary jednego pasa: koła z pozycji [low:high) pasa z marginesem, zgłaszane tylko pary,
+    # których mniejsza pozycja leży w rdzeniu pasa [start:end)
+    def strip_pairs(self, low, high, start, end, cell_size):
+        strip = CircleStore(self.x[low:high], self.y[low:high], self.radius[low:high])
+        first, second = strip.cell_pairs(cell_size)
+        first += low
+        second += low
+        owner = np.minimum(first, second)
+        keep = (owner >= start) & (owner < end)
+        return first[keep], second[keep]
+
+# Zbiory rozłączne (union-find) z łączeniem według rozmiaru i skracaniem ścieżek przez połowienie -
+# zamortyzowany koszt operacji jest prawie stały, a find działa bez rekurencji
+class UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.size = [1] * size
+        self.count = size
+
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, item1, item2):
+        root1 = self.find(item1)
+        root2 = self.find(item2)
+        if root1 == root2:
+            return False
+        if self.size[root1] < self.size[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        self.size[root1] += self.size[root2]
+        self.count -= 1
+        return True
+
+    def union_pairs(self, pairs):
+        for item1, item2 in pairs:
+            self.union(item1, item2)
+
+    # Elementy pogrupowane według zbioru, grupy od największej, elementy w grupie rosnąco
+    def groups(self):
+        groups = {}
+        for item in range(len(self.parent)):
+            groups.setdefault(self.find(item), []).append(item)
+        return sorted(groups.values(), key=len, reverse=True)
+
+# Pamięć podręczna wyników pochodnych grafu. Każda zmiana grafu podbija numer generacji i unieważnia
+# wszystkie wpisy; w obrębie generacji trzymanych jest najwyżej maxsize wyników, najdawniej używany
+# usuwany jako pierwszy (dotyczy głównie wyników z parametrami, np. liczby ścieżek dla każdej długości)
+class MemoCache:
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.generation = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def bump(self):
+        self.generation += 1
+        if self.entries:
+            self.entries.clear()
+
+    def clear(self):
+        self.entries.clear()
+
+    # Wynik z pamięci albo compute(); wynik liczony w trakcie zmiany grafu nie jest zapamiętywany
+    def lookup(self, key, compute):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        generation = self.generation
+        value = compute()
+        if generation == self.generation:
+            self.entries[key] = value
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return value
+
+    def stats(self):
+        return {"generation": self.generation, "entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+# Dekorator metod grafu - wynik zapamiętywany w self.memo dla bieżącej generacji grafu. Kluczem jest nazwa metody
+# i argumenty z uzupełnionymi wartościami domyślnymi, bez nazw z ignore (np. liczby procesów, która nie zmienia
+# wyniku). Przy argumentach niehaszowalnych wynik liczony jest bez pamięci. Zapamiętane tablice NumPy są tylko
+# do odczytu, a pozostałe wyniki są współdzielone między wywołaniami i nie należy ich modyfikować
+def memoized(*ignore):
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = (method.__name__, *((name, value) for name, value in list(bound.arguments.items())[1:]
+                                      if name not in ignore))
+            try:
+                hash(key)
+            except TypeError:
+                return method(self, *args, **kwargs)
+            return self.memo.lookup(key, lambda: _read_only(method(self, *args, **kwargs)))
+        return wrapper
+    return decorator
+
+# Tablice wyniku zamieniane na widoki tylko do odczytu - same tablice pozostają zapisywalne dla właściciela
+def _read_only(value):
+    if isinstance(value, np.ndarray):
+        value = value.view()
+        value.flags.writeable = False
+    elif isinstance(value, tuple):
+        value = tuple(_read_only(item) for item in value)
+    return value
+
+# Widok listy sąsiedztwa grafu kołowego z obiektami Circle - koła odtwarzane z magazynu dopiero przy odczycie
+class CircleAdjacencyView(Mapping):
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, circle):
+        key = self.graph.key_of(circle)
+        if key is None:
+            raise KeyError(circle)
+        return [self.graph.circle(neighbor) for neighbor in self.graph.adjacency[key]]
+
+    def __iter__(self):
+        return (self.graph.circle(key) for key in self.graph.adjacency)
+
+    def __len__(self):
+        return len(self.graph.adjacency)
+
+# Klasa grafu kołowego, przechowuje koła w kolumnowym magazynie (CircleStore), listę sąsiedztwa na kluczach kół
+# (numerach wierszy magazynu) oraz metody tworzące listę sąsiedztwa, zapisujące graf do pliku oraz odczytujące graf z pliku.
+# Usunięte koła zostają w magazynie jako puste wiersze (alive = 0), dopóki nie jest ich więcej niż żywych
 class CircleGraph:
-    def __init__(self, circles):
-        self.circles = circles
-        self.adjacency_list = self.create_adjacency_list()
-
-    # Tworzenie listy sąsiedztw
-    def create_adjacency_list(self):
-        adjacency_list = {}
-        for circle in self.circles:
-            neighbors = []
-            for other_circle in self.circles:
-                if circle != other_circle and circle.intersects(other_circle):
-                    neighbors.append(other_circle)
-            adjacency_list[circle] = neighbors
-        return adjacency_list
+    # Dostępne silniki wyszukiwania przecięć: pełne porównanie par, siatka przestrzenna, zamiatanie po osi X,
+    # blokowe jądro NumPy na kolumnowym magazynie kół, siatka na tablicach liczona pasami w puli procesów
+    ENGINES = ("naive", "grid", "sweep", "numpy", "parallel")
+    # Najmniejsza liczba pustych wierszy, przy której magazyn jest zagęszczany
+    COMPACT_MIN_DEAD = 1024
+    # Rysowanie: powyżej PLOT_MAX_CIRCLES kół rysowana jest próbka, a wszystkie środki jako mapa gęstości
+    # o PLOT_DENSITY_BINS przedziałach na oś
+    PLOT_MAX_CIRCLES = 20000
+    PLOT_DENSITY_BINS = 512
+    # Zapytania wsadowe przetwarzane porcjami po najwyżej QUERY_CHUNK_CELLS par (zapytanie, komórka siatki)
+    QUERY_CHUNK_CELLS = 1 << 20
+
+    # circles to lista kół albo CircleStore, który graf przejmuje na własność.
+    # processes - liczba procesów silnika "parallel", domyślnie liczba rdzeni
+    def __init__(self, circles, engine="grid", processes=None):
+        self.store = circles if isinstance(circles, CircleStore) else CircleStore.from_circles(list(circles))
+        self.engine = engine
+        self.processes = processes
+        self.memo = MemoCache()
+        self.alive = bytearray(b"\x01") * len(self.store)
+        self.adjacency = self.create_adjacency_list()
+        self._build_index()
+        self._build_id_index()
+
+    # Lista sąsiedztwa z obiektami Circle, jak przed przejściem na magazyn kolumnowy
+    @property
+    def adjacency_list(self):
+        return CircleAdjacencyView(self)
+
+    @property
+    def circles(self):
+        return [self.circle(key) for key in self.adjacency]
+
+    def circle(self, key):
+        return self.store.circle(key)
+
+    def live_keys(self):
+        return np.flatnonzero(np.frombuffer(self.alive, dtype=np.uint8))
+
+    # Klucz koła o tych samych wartościach, ostatnio dodanego; None, gdy takiego koła nie ma w grafie.
+    # Koło o tym samym środku leży w tej samej komórce siatki, więc wystarczy przejrzeć jedną komórkę
+    def key_of(self, circle):
+        return self._find_key(circle.id, circle.x, circle.y, circle.radius)
+
+    def _find_key(self, circle_id, x, y, radius):
+        store = self.store
+        for key in reversed(self.index.cells.get(self.index.cell_of(x, y), ())):
+            if store.x[key] == x and store.y[key] == y and store.radius[key] == radius and store.ids[key] == circle_id:
+                return key
+        return None
+
+    # Żywe klucze kół o danym identyfikatorze, rosnąco (ostatni to koło dodane najpóźniej)
+    def keys_with_id(self, circle_id):
+        return list(self.keys_by_id.get(circle_id, ()))
+
+    # Strumień par kluczy (i, j) przecinających się kół, wyznaczany wybranym silnikiem na kolumnach magazynu
+    def intersecting_pairs(self, engine=None):
+        return self._intersecting_pairs(engine, self.live_keys().tolist())
+
+    # Pozycje par z silnika tłumaczone na klucze z listy keys, więc listy sąsiadów dzielą obiekty int z kluczami
+    def _intersecting_pairs(self, engine, keys):
+        engine = engine or self.engine
+        store = self.store if len(keys) == len(self.store) else self.store.take(keys)
+        if engine == "naive":
+            pairs = self._pairs_naive(store)
+        elif engine == "grid":
+            pairs = self._pairs_grid(store)
+        elif engine == "sweep":
+            pairs = self._pairs_sweep(store)
+        elif engine == "numpy":
+            pairs = self._pairs_numpy(store)
+        elif engine == "parallel":
+            pairs = self._pairs_parallel(store)
+        else:
+            raise ValueError(f"Nieznany silnik {engine}, dostępne: {', '.join(self.ENGINES)}")
+        return ((keys[i], keys[j]) for i, j in pairs)
+
+    # Tworzenie listy sąsiedztw wybranym silnikiem - klucz koła -> rosnąca lista kluczy sąsiadów
+    def create_adjacency_list(self, engine=None):
+        keys = self.live_keys().tolist()
+        adjacency = {key: [] for key in keys}
+        for i, j in self._intersecting_pairs(engine, keys):
+            adjacency[i].append(j)
+            adjacency[j].append(i)
+        for neighbors in adjacency.values():
+            neighbors.sort()
+        return adjacency
+
+    # Porównanie kwadratów odległości kół i oraz j z kolumn współrzędnych - bez pierwiastkowania
+    @staticmethod
+    def _overlap(xs, ys, radii, i, j):
+        dx = xs[i] - xs[j]
+        dy = ys[i] - ys[j]
+        reach = radii[i] + radii[j]
+        return dx * dx + dy * dy < reach * reach
+
+    # Porównanie każdej pary kół - O(n^2)
+    def _pairs_naive(self, store):
+        xs, ys, radii = store.x.tolist(), store.y.tolist(), store.radius.tolist()
+        for i in range(len(xs)):
+            for j in range(i + 1, len(xs)):
+                if self._overlap(xs, ys, radii, i, j):
+                    yield i, j
+
+    # Porównanie tylko kół z tej samej lub sąsiedniej komórki siatki
+    def _pairs_grid(self, store):
+        if len(store) == 0:
+            return
+        xs, ys, radii = store.x.tolist(), store.y.tolist(), store.radius.tolist()
+        grid = SpatialGrid(2 * max(radii))
+        for i in range(len(xs)):
+            grid.insert(i, xs[i], ys[i])
+        for (cx, cy), bucket in grid.cells.items():
+            for position, i in enumerate(bucket):
+                for j in bucket[position + 1:]:
+                    if self._overlap(xs, ys, radii, i, j):
+                        yield i, j
+            for dx, dy in SpatialGrid.HALF_NEIGHBORHOOD:
+                other_bucket = grid.cells.get((cx + dx, cy + dy))
+                if not other_bucket:
+                    continue
+                for i in bucket:
+                    for j in other_bucket:
+                        if self._overlap(xs, ys, radii, i, j):
+                            yield i, j
+
+    # Zamiatanie po osi X - koła posortowane po lewej krawędzi prostokąta ograniczającego,
+    # porównywane tylko z kołami, których prostokąty nachodzą na siebie
+    def _pairs_sweep(self, store):
+        xs, ys, radii = store.x.tolist(), store.y.tolist(), store.radius.tolist()
+        order = sorted(range(len(xs)), key=lambda i: xs[i] - radii[i])
+        for position, i in enumerate(order):
+            right_edge = xs[i] + radii[i]
+            for next_position in range(position + 1, len(order)):
+                j = order[next_position]
+                if xs[j] - radii[j] >= right_edge:
+                    break
+                if abs(ys[i] - ys[j]) < radii[i] + radii[j] and self._overlap(xs, ys, radii, i, j):
+                    yield i, j
+
+    # Pary z blokowego jądra NumPy
+    def _pairs_numpy(self, store):
+        first, second = store.intersecting_pairs()
+        return zip(first.tolist(), second.tolist())
+
+    # Pary z siatki na tablicach liczonej pasami w puli self.processes procesów
+    def _pairs_parallel(self, store):
+        first, second = store.parallel_pairs(self.processes)
+        return zip(first.tolist(), second.tolist())
+
+    # Skupiska nachodzących na siebie kół, od największego. Liczone wprost ze strumienia par silnika
+    # przez union-find, bez budowania słownika sąsiedztwa
+    @memoized()
+    def connected_components(self, engine=None):
+        components = UnionFind(len(self.store))
+        components.union_pairs(self.intersecting_pairs(engine))
+        return [[self.circle(key) for key in group] for group in components.groups() if self.alive[group[0]]]
+
+    # Odległości w liczbie przejść od koła start do wszystkich osiągalnych kół
+    def bfs_distances(self, start, max_depth=None):
+        key = self.key_of(start)
+        if key is None:
+            raise KeyError(start)
+        return {self.circle(other_key): distance
+                for other_key, distance in Graph.bfs_levels(self.adjacency, key, max_depth).items()}
 
     def show_adjacency_list(self):
         print("Lista sąsiedztwa:")
@@ -47,86 +679,594 @@ class CircleGraph:
     def write_to_file(self, filename):
         print("Chcesz dodać komentarz? T/N")
         input_comment = input()
+        comment = None
         if (input_comment == "T") or (input_comment == "t"):
             comment = input("Podaj komentarz: ")
-            with open(filename, "w") as f:
-                f.write(f"#{comment}\n")
-                f.write(f"#Id X Y Rad\n")
-                for circle in self.circles:
-                    f.write(f"{circle.id} {circle.x} {circle.y} {circle.radius}\n")
+        self.save_to_file(filename, comment)
+
+    # Zapis bez pytań - plik .gcir binarnie, każdy inny tekstowo, tylko koła obecne w grafie
+    def save_to_file(self, filename, comment=None):
+        keys = self.live_keys()
+        store = self.store if len(keys) == len(self.store) else self.store.take(keys)
+        store.write_file(filename, comment)
 
-    # Odczytanie grafu z pliku
+    # Odczytanie grafu z pliku tekstowego (blokami) albo binarnego .gcir wprost do kolumn magazynu
     @classmethod
-    def read_from_file(cls, filename):
-        circles = []
-        with open(filename, "r") as f:
-            for line in f:
-                if line.startswith("#"):
-                    continue
-                id, x, y, radius = map(float, line.strip().split())
-                circles.append(Circle(id, x, y, radius))
-        return cls(circles)
+    def read_from_file(cls, filename, engine="grid", chunk_size=None, processes=None):
+        return cls(CircleStore.read_file(filename, chunk_size), engine, processes)
 
-    # Dodanie nowego koła do grafu
+    # Dodanie nowego koła do grafu, zwraca jego klucz
     def add_circle(self, circle):
-        self.circles.append(circle)
-        self.adjacency_list = self.create_adjacency_list()
+        self._ensure_cell_size(circle.radius)
+        return self._insert_circle(circle.id, circle.x, circle.y, circle.radius)
+
+    # Dodanie wielu kół naraz - indeks powiększany najwyżej raz, a przy partii większej niż graf pełna przebudowa.
+    # Koła już obecne w grafie (także powtórzone w partii) są pomijane, jak w add_circle
+    def add_circles(self, circles):
+        circles = list(circles)
+        if not circles:
+            return
+        if len(circles) > len(self.adjacency):
+            added = set()
+            for circle in circles:
+                values = (circle.id, circle.x, circle.y, circle.radius)
+                if values in added or self._find_key(*values) is not None:
+                    print("Koło już istnieje w grafie.")
+                    continue
+                added.add(values)
+                self.store.append(*values)
+            self.alive.extend(b"\x01" * len(added))
+            self.adjacency = self.create_adjacency_list()
+            self._build_index()
+            self._build_id_index()
+            return
+        self._ensure_cell_size(max(circle.radius for circle in circles))
+        for circle in circles:
+            self._insert_circle(circle.id, circle.x, circle.y, circle.radius)
 
     def delete_circle_by_id(self, circle_id):
-        circle_to_remove = None
-        for circle in self.circles:
-            if circle.id == circle_id:
-                circle_to_remove = circle
-        if circle_to_remove:
-            if circle_to_remove in self.adjacency_list:
-                del self.adjacency_list[circle_to_remove]
-            else:
-                print("Circle not found in the adjacency list.")
-        else:
+        same_id = self.keys_by_id.get(circle_id)
+        if not same_id:
             print("Circle with ID", circle_id, "not found.")
+            return
+        self._detach_circle(same_id[-1])
+        self._compact_if_sparse()
+
+    # Usunięcie wielu kół naraz - zagęszczenie magazynu najwyżej raz, po całej partii
+    def delete_circles_by_id(self, circle_ids):
+        for circle_id in circle_ids:
+            same_id = self.keys_by_id.get(circle_id)
+            if not same_id:
+                print("Circle with ID", circle_id, "not found.")
+                continue
+            self._detach_circle(same_id[-1])
+        self._compact_if_sparse()
+
+    # Trwały indeks przestrzenny kluczy, potrzebny przy aktualizacjach przyrostowych i zapytaniach
+    def _build_index(self, min_cell_size=0.0):
+        keys = list(self.adjacency)
+        key_array = np.array(keys, dtype=np.int64)
+        store = self.store
+        max_radius = float(store.radius[key_array].max()) if keys else 0.0
+        self.index = SpatialGrid(max(2 * max_radius, min_cell_size))
+        self.memo.bump()
+        for key, x, y in zip(keys, store.x[key_array].tolist(), store.y[key_array].tolist()):
+            self.index.insert(key, x, y)
+
+    # Słownik identyfikator -> rosnąca lista żywych kluczy kół o tym identyfikatorze
+    def _build_id_index(self):
+        keys = self.live_keys()
+        self.keys_by_id = {}
+        for key, circle_id in zip(keys.tolist(), self.store.ids[keys].tolist()):
+            self.keys_by_id.setdefault(circle_id, []).append(key)
+
+    # Komórka siatki musi mieścić największą średnicę, inaczej sąsiednie komórki nie wystarczą.
+    # Bok jest co najmniej podwajany, więc przebudowy są rzadkie
+    def _ensure_cell_size(self, radius):
+        if 2 * radius > self.index.cell_size:
+            self._build_index(max(2 * radius, 2 * self.index.cell_size))
+
+    # Nowe koło porównywane tylko z kandydatami z sąsiednich komórek siatki. Klucz nowego koła jest największy,
+    # więc listy sąsiadów pozostają posortowane
+    def _insert_circle(self, circle_id, x, y, radius):
+        if self._find_key(circle_id, x, y, radius) is not None:
+            print("Koło już istnieje w grafie.")
+            return None
+        neighbors = self._overlapping(list(self.index.nearby(x, y)), x, y, radius)
+        key = self.store.append(circle_id, x, y, radius)
+        self.alive.append(1)
+        self.memo.bump()
+        for neighbor in neighbors:
+            self.adjacency[neighbor].append(key)
+        self.adjacency[key] = neighbors
+        self.index.insert(key, x, y)
+        self.keys_by_id.setdefault(float(circle_id), []).append(key)
+        return key
+
+    # Usunięcie koła z listy sąsiedztwa razem z odwołaniami u sąsiadów oraz z indeksu; wiersz w magazynie zostaje pusty
+    def _detach_circle(self, key):
+        self.memo.bump()
+        for neighbor in self.adjacency.pop(key):
+            self.adjacency[neighbor].remove(key)
+        self.index.remove(key, float(self.store.x[key]), float(self.store.y[key]))
+        self.alive[key] = 0
+        circle_id = float(self.store.ids[key])
+        same_id = self.keys_by_id[circle_id]
+        same_id.remove(key)
+        if not same_id:
+            del self.keys_by_id[circle_id]
+
+    # Zagęszczenie magazynu, gdy pustych wierszy jest więcej niż żywych - klucze kół zmieniają się
+    def _compact_if_sparse(self):
+        dead = len(self.store) - len(self.adjacency)
+        if dead < self.COMPACT_MIN_DEAD or dead <= len(self.adjacency):
+            return
+        keys = self.live_keys()
+        new_keys = np.full(len(self.store), -1, dtype=np.int64)
+        new_keys[keys] = np.arange(len(keys))
+        new_keys = new_keys.tolist()
+        self.store = self.store.take(keys)
+        self.alive = bytearray(b"\x01") * len(keys)
+        self.adjacency = {new_keys[key]: [new_keys[neighbor] for neighbor in neighbors]
+                          for key, neighbors in self.adjacency.items()}
+        self.keys_by_id = {circle_id: [new_keys[key] for key in same_id]
+                           for circle_id, same_id in self.keys_by_id.items()}
+        self._build_index(self.index.cell_size)
+
+    # Klucze kół z listy kandydatów, które przecinają koło (x, y, radius), rosnąco
+    def _overlapping(self, candidates, x, y, radius):
+        if not candidates:
+            return []
+        candidates = np.array(candidates, dtype=np.int64)
+        store = self.store
+        dx = store.x[candidates] - x
+        dy = store.y[candidates] - y
+        reach = store.radius[candidates] + radius
+        return np.sort(candidates[dx * dx + dy * dy < reach * reach]).tolist()
+
+    # Zapytania przestrzenne na trwałym indeksie siatki. Bok komórki to co najmniej największa średnica,
+    # więc środek koła leży najwyżej pół komórki od dowolnego jego punktu - wystarczą komórki zapytania
+    # poszerzonego o pół komórki. Wyniki w kolejności kluczy
+    def circles_at_point(self, x, y):
+        return [self.circle(key) for key in self._overlapping(list(self.index.nearby(x, y)), x, y, 0.0)]
+
+    # Koła nachodzące na prostokąt - odległość środka od najbliższego punktu prostokąta mniejsza niż promień
+    def circles_in_rect(self, xmin, ymin, xmax, ymax):
+        margin = self.index.cell_size / 2
+        candidates = list(self.index.in_box(xmin - margin, ymin - margin, xmax + margin, ymax + margin))
+        if not candidates:
+            return []
+        candidates = np.array(candidates, dtype=np.int64)
+        store = self.store
+        dx = np.maximum(np.maximum(xmin - store.x[candidates], store.x[candidates] - xmax), 0.0)
+        dy = np.maximum(np.maximum(ymin - store.y[candidates], store.y[candidates] - ymax), 0.0)
+        found = np.sort(candidates[dx * dx + dy * dy < store.radius[candidates] ** 2])
+        return [self.circle(key) for key in found.tolist()]
 
+    # Koła przecinające koło zapytania (x, y, radius), ten sam warunek co Circle.intersects
+    def circles_overlapping(self, x, y, radius):
+        return [self.circle(key) for key in self._overlapping_keys(x, y, radius)]
 
+    def _overlapping_keys(self, x, y, radius):
+        reach = radius + self.index.cell_size / 2
+        return self._overlapping(list(self.index.in_box(x - reach, y - reach, x + reach, y + reach)), x, y, radius)
 
+    # Zapytania wsadowe dla tablic punktów (radius > 0: koła zapytań o wspólnym promieniu).
+    # Wynik w układzie CSR: klucze kół (self.circle(klucz)) trafionych przez zapytanie i to
+    # keys[offsets[i]:offsets[i + 1]], rosnąco
+    def query_points(self, x, y, radius=0.0):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        offsets = np.zeros(len(x) + 1, dtype=np.int64)
+        if len(self.adjacency) == 0 or len(x) == 0:
+            return offsets, np.empty(0, dtype=np.int64)
+        width, height, occupied = self._build_query_arrays()[5:]
+        cell_size = self.index.cell_size
+        if width * height >= 1 << 62:
+            lists = [self._overlapping_keys(qx, qy, radius) for qx, qy in zip(x.tolist(), y.tolist())]
+            np.cumsum([len(found) for found in lists], out=offsets[1:])
+            return offsets, np.fromiter((key for found in lists for key in found), dtype=np.int64,
+                                        count=int(offsets[-1]))
+        reach = math.ceil(radius / cell_size + 0.5)
+        # Gdy okno komórek zapytania jest większe od liczby niepustych komórek, przeglądane są niepuste komórki,
+        # jak w SpatialGrid.in_box
+        by_occupied = (2 * reach + 1) ** 2 > len(occupied)
+        chunk_size = max(1, self.QUERY_CHUNK_CELLS // min((2 * reach + 1) ** 2, len(occupied)))
+        query_parts, found_parts = [], []
+        for start in range(0, len(x), chunk_size):
+            queries, found = self._query_chunk(x[start:start + chunk_size], y[start:start + chunk_size], radius,
+                                               reach, by_occupied)
+            query_parts.append(queries + start)
+            found_parts.append(found)
+        queries, found = np.concatenate(query_parts), np.concatenate(found_parts)
+        order = np.lexsort((found, queries))
+        np.cumsum(np.bincount(queries, minlength=len(x)), out=offsets[1:])
+        return offsets, found[order]
 
-    # Rysowanie grafu
-    def plot_circles(self):
-        fig, ax = plt.subplots()
-        for circle in self.circles:
-            circle_plot = plt.Circle((circle.x, circle.y), circle.radius, edgecolor='b', facecolor='none')
-            ax.add_artist(circle_plot)
-            ax.plot(circle.x, circle.y, 'ro')
+    # Pary (numer zapytania, klucz trafionego koła) dla jednej porcji zapytań
+    def _query_chunk(self, x, y, radius, reach, by_occupied):
+        cell_keys_sorted, keys, store, cx_min, cy_min, width, height, occupied = self._build_query_arrays()
+        cell_size = self.index.cell_size
+        query_x = np.floor(x / cell_size).astype(np.int64) - cx_min
+        query_y = np.floor(y / cell_size).astype(np.int64) - cy_min
+        if by_occupied:
+            near = ((np.abs(occupied // height - query_x[:, None]) <= reach)
+                    & (np.abs(occupied % height - query_y[:, None]) <= reach))
+            queries, cells = np.nonzero(near)
+            cell_keys = occupied[cells]
+        else:
+            steps = np.arange(-reach, reach + 1)
+            cell_x = query_x[:, None, None] + steps[None, :, None]
+            cell_y = query_y[:, None, None] + steps[None, None, :]
+            valid = (cell_x >= 0) & (cell_x < width) & (cell_y >= 0) & (cell_y < height)
+            queries = np.broadcast_to(np.arange(len(x))[:, None, None], valid.shape)[valid]
+            cell_keys = (cell_x * height + cell_y)[valid]
+        starts = np.searchsorted(cell_keys_sorted, cell_keys, side="left")
+        lengths = np.searchsorted(cell_keys_sorted, cell_keys, side="right") - starts
+        total = int(lengths.sum())
+        candidates = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        queries = np.repeat(queries, lengths)
+        dx = store.x[candidates] - x[queries]
+        dy = store.y[candidates] - y[queries]
+        reach_squared = (store.radius[candidates] + radius) ** 2
+        hit = dx * dx + dy * dy < reach_squared
+        return queries[hit], keys[candidates[hit]]
+
+    # Żywe koła posortowane według klucza komórki siatki - komórka zapytania to zakres wyszukiwania binarnego,
+    # oraz klucze niepustych komórek. Budowane raz na generację grafu
+    @memoized()
+    def _build_query_arrays(self):
+        keys = self.live_keys()
+        store = self.store.take(keys)
+        cell_size = self.index.cell_size
+        cell_x = np.floor(store.x / cell_size).astype(np.int64)
+        cell_y = np.floor(store.y / cell_size).astype(np.int64)
+        cx_min, cy_min = int(cell_x.min()), int(cell_y.min())
+        width, height = int(cell_x.max()) - cx_min + 1, int(cell_y.max()) - cy_min + 1
+        cell_keys = (cell_x - cx_min) * height + (cell_y - cy_min)
+        order = np.argsort(cell_keys, kind="stable")
+        cell_keys = cell_keys[order]
+        return (cell_keys, keys[order], store.take(order), cx_min, cy_min, width, height,
+                CSRGraph.sorted_unique(cell_keys))
+
+    # Rysowanie grafu - wszystkie koła jednym EllipseCollection, środki jednym scatterem, granice osi z kolumn.
+    # Przy więcej niż max_circles kołach rysowana jest równomierna próbka max_circles kół na rastrowej mapie
+    # gęstości wszystkich środków. Z filename rysunek zapisywany jest do pliku (np. PNG) bez pyplot i bez okna,
+    # więc działa w zadaniach wsadowych i bez wyświetlacza. matplotlib importowany dopiero tutaj, bo sam import
+    # trwa dłużej niż reszta modułu
+    def plot_circles(self, filename=None, max_circles=None, dpi=100):
+        from matplotlib.collections import EllipseCollection
+        keys = self.live_keys()
+        if len(keys) == 0:
+            print("Graf nie zawiera kół.")
+            return
+        x, y, radius = self.store.x[keys], self.store.y[keys], self.store.radius[keys]
+        x_min, x_max = float((x - radius).min()) - 1, float((x + radius).max()) + 1
+        y_min, y_max = float((y - radius).min()) - 1, float((y + radius).max()) + 1
+        if filename is None:
+            import matplotlib.pyplot as plt
+            fig, ax = plt.subplots()
+        else:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+            fig = Figure()
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+        max_circles = self.PLOT_MAX_CIRCLES if max_circles is None else max_circles
+        if len(keys) > max_circles:
+            density, _, _ = np.histogram2d(x, y, bins=self.PLOT_DENSITY_BINS, range=((x_min, x_max), (y_min, y_max)))
+            ax.imshow(density.T, origin="lower", extent=(x_min, x_max, y_min, y_max), cmap="Greys", interpolation="nearest")
+            sample = np.sort(np.random.default_rng(0).choice(len(keys), max_circles, replace=False))
+            x, y, radius = x[sample], y[sample], radius[sample]
+        # Przy tysiącach kół cieńsze linie i mniejsze środki, żeby nie zasłoniły rysunku
+        detail = min(1.0, 1000 / len(x)) if len(x) else 1.0
+        diameters = 2 * radius
+        ax.add_collection(EllipseCollection(diameters, diameters, np.zeros_like(diameters), units="xy",
+                                            offsets=np.column_stack((x, y)), offset_transform=ax.transData,
+                                            edgecolors="b", facecolors="none", linewidths=max(detail, 0.2)))
+        ax.scatter(x, y, s=max(9 * detail, 0.5), c="r", marker="o", linewidths=0)
         ax.set_aspect('equal', adjustable='box')
-        ax.set_xlim(min(circle.x - circle.radius for circle in self.circles) - 1,
-                    max(circle.x + circle.radius for circle in self.circles) + 1)
-        ax.set_ylim(min(circle.y - circle.radius for circle in self.circles) - 1,
-                    max(circle.y + circle.radius for circle in self.circles) + 1)
-        plt.xlabel('X')
-        plt.ylabel('Y')
-        plt.title('Circles')
-        plt.grid(True)
-        plt.show()
+        ax.set_xlim(x_min, x_max)
+        ax.set_ylim(y_min, y_max)
+        ax.set_xlabel('X')
+        ax.set_ylabel('Y')
+        ax.set_title('Circles')
+        ax.grid(True)
+        if filename is None:
+            plt.show()
+        else:
+            fig.savefig(filename, dpi=dpi)
+
+# Komentarz od # do końca linii w plikach tekstowych z liczbami
+_COMMENT_PATTERN = re.compile(rb"#[^\n]*")
+
+# Plik tekstowy z liczbami (SNAP, pliki kół) czytany blokami pełnych linii, każdy jako tablica n x columns.
+# Blok nie jest większy od pliku, bo read() rezerwuje cały bufor z góry i zawyżałby szczyt pamięci w LoadStats
+def iter_number_blocks(filename, columns, dtype, chunk_size, extra_columns=False):
+    with open(filename, "rb") as file:
+        file_size = os.fstat(file.fileno()).st_size
+        if file_size:
+            chunk_size = min(chunk_size, file_size)
+        tail = b""
+        for block in iter(lambda: file.read(chunk_size), b""):
+            block = tail + block
+            cut = block.rfind(b"\n") + 1
+            tail = block[cut:]
+            values = parse_number_block(block[:cut], columns, dtype, filename, extra_columns)
+            if len(values):
+                yield values
+        values = parse_number_block(tail, columns, dtype, filename, extra_columns)
+        if len(values):
+            yield values
+
+# Blok pełnych linii jako tablica n x columns. Komentarze są wycinane, a wszystkie liczby parsowane naraz
+# przez np.fromstring. Liczba wartości w każdym wierszu sprawdzana jest na tablicach: wiersz o innej liczbie
+# kolumn to ValueError, a przy extra_columns=True nadmiarowe kolumny (np. wagi krawędzi) są pomijane
+def parse_number_block(data, columns, dtype, filename, extra_columns=False):
+    # Komentarze są zwykle tylko w nagłówku, więc wycinany jest jedynie fragment od pierwszego do ostatniego #
+    first_comment = data.find(b"#")
+    if first_comment >= 0:
+        comments_end = data.find(b"\n", data.rfind(b"#"))
+        comments_end = len(data) if comments_end < 0 else comments_end
+        data = data[:first_comment] + _COMMENT_PATTERN.sub(b"", data[first_comment:comments_end]) + data[comments_end:]
+    raw = np.frombuffer(data, dtype=np.uint8)
+    separator = raw <= 32
+    token_starts = np.flatnonzero(~separator & np.concatenate(([True], separator[:-1])))
+    if len(token_starts) == 0:
+        return np.empty((0, columns), dtype=dtype)
+    line_ends = np.append(np.searchsorted(token_starts, np.flatnonzero(raw == 10)), len(token_starts))
+    counts = np.diff(line_ends, prepend=0)
+    bad = (counts < columns) if extra_columns else (counts != columns)
+    bad &= counts > 0
+    if bad.any():
+        line = data.split(b"\n")[int(np.argmax(bad))].decode("ascii", "replace")
+        raise ValueError(f"Plik {filename} zawiera wiersz o niepoprawnej liczbie kolumn: {line}")
+    # Nadmiarowe kolumny mogą być ułamkowe (wagi), wtedy całość czytana jest jako float64
+    text = data.decode("ascii", "replace")
+    parse_dtype = dtype
+    if extra_columns and b"." in data:
+        parse_dtype = np.float64
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        try:
+            values = np.fromstring(text, dtype=parse_dtype, sep=" ")
+        except ValueError:
+            values = ()
+    if len(values) != len(token_starts):
+        raise ValueError(f"Plik {filename} zawiera wartość, która nie jest liczbą.")
+    counts = counts[counts > 0]
+    if not extra_columns or (counts == columns).all():
+        values = values.reshape(-1, len(values) // len(counts))[:, :columns]
+    else:
+        row_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        values = values[row_starts[:, None] + np.arange(columns)]
+    if parse_dtype != dtype:
+        converted = values.astype(dtype)
+        if (converted != values).any():
+            raise ValueError(f"Plik {filename} zawiera wartość, która nie jest liczbą całkowitą.")
+        values = converted
+    return values
+
+# Pomiar wczytywania - czas, liczba krawędzi na sekundę i szczytowa pamięć zaalokowana w trakcie (tracemalloc)
+class LoadStats:
+    def __init__(self, label):
+        self.label = label
+        self.edges = 0
+        self.seconds = 0.0
+        self.peak_bytes = 0
+
+    def __enter__(self):
+        self._was_tracing = tracemalloc.is_tracing()
+        if self._was_tracing:
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.start()
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds = perf_counter() - self._start
+        self.peak_bytes = tracemalloc.get_traced_memory()[1]
+        if not self._was_tracing:
+            tracemalloc.stop()
+        return False
+
+    @property
+    def edges_per_second(self):
+        return self.edges / self.seconds if self.seconds > 0 else float("inf")
+
+    def report(self):
+        print(f"{self.label}: {self.edges} krawędzi w {self.seconds:.3f} s "
+              f"({self.edges_per_second:.0f} krawędzi/s), szczytowa pamięć {self.peak_bytes / 2 ** 20:.1f} MiB")
+
+# Histogram stopni - liczba wierzchołków dla każdego stopnia i posortowana lista występujących stopni.
+# Zmiana stopnia kosztuje O(1) plus wstawienie do listy różnych stopni, których jest niewiele
+class DegreeHistogram:
+    def __init__(self, degrees=()):
+        self.counts = {}
+        self.sorted_degrees = []
+        self.degree_sum = 0
+        self.vertex_count = 0
+        for degree in degrees:
+            self.add(degree)
+
+    # Histogram z tablicy stopni jednym przebiegiem np.bincount
+    @classmethod
+    def from_array(cls, degrees):
+        histogram = cls()
+        degrees = np.asarray(degrees, dtype=np.int64)
+        if len(degrees):
+            counts = np.bincount(degrees)
+            present = np.flatnonzero(counts)
+            histogram.counts = dict(zip(present.tolist(), counts[present].tolist()))
+            histogram.sorted_degrees = present.tolist()
+            histogram.degree_sum = int(degrees.sum())
+            histogram.vertex_count = len(degrees)
+        return histogram
+
+    def add(self, degree):
+        if degree in self.counts:
+            self.counts[degree] += 1
+        else:
+            self.counts[degree] = 1
+            bisect.insort(self.sorted_degrees, degree)
+        self.degree_sum += degree
+        self.vertex_count += 1
+
+    def remove(self, degree):
+        self.counts[degree] -= 1
+        if not self.counts[degree]:
+            del self.counts[degree]
+            del self.sorted_degrees[bisect.bisect_left(self.sorted_degrees, degree)]
+        self.degree_sum -= degree
+        self.vertex_count -= 1
+
+    def change(self, old_degree, new_degree):
+        self.remove(old_degree)
+        self.add(new_degree)
+
+    def max_degree(self):
+        return self.sorted_degrees[-1] if self.sorted_degrees else 0
+
+    # Reguła z Graph.annihilation_from_degrees liczona grupami równych stopni zamiast po wierzchołkach:
+    # (wynik, ostatnia suma prefiksowa mniejsza od liczby krawędzi albo None)
+    def annihilation(self):
+        if not self.vertex_count:
+            return 0, None
+        num_edges = self.degree_sum // 2
+        prefix = 0
+        last_prefix = None
+        for degree in self.sorted_degrees:
+            count = self.counts[degree]
+            if degree == 0:
+                if prefix >= num_edges:
+                    return min(prefix, num_edges), last_prefix
+                last_prefix = prefix
+                continue
+            steps = max(1, -(-(num_edges - prefix) // degree))
+            if steps <= count:
+                if steps > 1:
+                    last_prefix = prefix + degree * (steps - 1)
+                return min(prefix + degree * steps, num_edges), last_prefix
+            prefix += degree * count
+            last_prefix = prefix
+        return prefix, last_prefix
 
 # Klasa Grafu
 class Graph:
+    # Rozmiar bloku czytanego naraz przez szybkie wczytywanie plików SNAP
+    SNAP_CHUNK_SIZE = 1 << 24
+
     def __init__(self):
         self.adjacency_list = {}
-        self.degrees = {}
-        self.annih_number = 0
-        self.poten = 0
+        self.memo = MemoCache()
+        self.journal = None
+        self.set_degrees({})
 
-    # Przetworzenie macierzy na listę sąsiedztwa
-    def matrix_to_list(self, matrix):
-        self.adjacency_list = {}
-        self.degrees = {}
-        for i in range(len(matrix)):
-            neighbors = []
-            degree = 0
-            for j in range(len(matrix[i])):
-                if matrix[i][j] == 1:
-                    neighbors.append(j)
-                    degree += 1
-            self.adjacency_list[i] = neighbors
-            self.degrees[i] = degree
+    # Liczba anihilacji i potencjał liczone z histogramu stopni, więc zawsze aktualne
+    @property
+    def annih_number(self):
+        return self.degree_histogram.annihilation()[1] or 0
+
+    @property
+    def poten(self):
+        return self.degree_histogram.max_degree()
+
+    # Podmiana całego słownika stopni razem z histogramem. Generację self.memo podbija każda operacja zmieniająca
+    # graf: set_degrees, dodanie i usunięcie krawędzi albo wierzchołka oraz odczyt pliku SNAP
+    def set_degrees(self, degrees):
+        self.memo.bump()
+        self.degrees = degrees
+        self.degree_histogram = DegreeHistogram(degrees.values())
+
+    # Zmiana stopnia jednego wierzchołka, histogram aktualizowany w O(1)
+    def _change_degree(self, vertex, delta):
+        old_degree = self.degrees[vertex]
+        self.degrees[vertex] = old_degree + delta
+        self.degree_histogram.change(old_degree, old_degree + delta)
+
+    # Przetworzenie macierzy na listę sąsiedztwa - jedynka na przekątnej to pętla własna, zapisana w liście
+    # dwa razy i liczona podwójnie do stopnia, jak przy add_edge(v, v). Przyjmuje listę list, tablicę NumPy, macierz bitową
+    # (packed=True, wiersze z np.packbits), parę tablic (wiersze, kolumny) w formacie COO albo macierz scipy.sparse.
+    # vertex_ids zamienia indeksy wierszy i kolumn z powrotem na identyfikatory wierzchołków
+    def matrix_to_list(self, matrix, vertex_ids=None, packed=False):
+        if hasattr(matrix, "tocoo"):
+            coo = matrix.tocoo()
+            is_edge = coo.data == 1
+            rows, cols = coo.row[is_edge], coo.col[is_edge]
+            vertex_count = matrix.shape[0]
+        elif isinstance(matrix, tuple):
+            rows, cols = (np.asarray(part, dtype=np.int64) for part in matrix)
+            if vertex_ids is not None:
+                vertex_count = len(vertex_ids)
+            else:
+                vertex_count = int(max(rows.max(initial=-1), cols.max(initial=-1))) + 1
+        else:
+            matrix = np.asarray(matrix)
+            if packed:
+                matrix = np.unpackbits(matrix, axis=1, count=len(matrix))
+            rows, cols = np.nonzero(matrix == 1)
+            vertex_count = len(matrix)
+        loops = rows == cols
+        rows, cols = np.concatenate((rows, rows[loops])), np.concatenate((cols, cols[loops]))
+        order = np.lexsort((cols, rows))
+        rows, cols = rows[order], cols[order]
+        degrees = np.bincount(rows, minlength=vertex_count)
+        if vertex_ids is None:
+            vertices = list(range(vertex_count))
+            targets = cols.tolist()
+        else:
+            vertex_ids = np.asarray(vertex_ids)
+            vertices = vertex_ids.tolist()
+            targets = vertex_ids[cols].tolist()
+        offsets = np.concatenate(([0], np.cumsum(degrees))).tolist()
+        self.adjacency_list = {vertex: targets[offsets[index]:offsets[index + 1]]
+                               for index, vertex in enumerate(vertices)}
+        self.set_degrees(dict(zip(vertices, degrees.tolist())))
+        self._journal_snapshot()
+
+    # Macierz sąsiedztwa w wybranym formacie, zwracana razem z tablicą identyfikatorów wierzchołków
+    # odpowiadających kolejnym wierszom. Przy remap=True identyfikatory są przemapowane na 0..n-1,
+    # więc pojedynczy wierzchołek o dużym numerze nie powiększa macierzy.
+    # Formaty: "dense" - uint8 n x n, "bits" - wiersze spakowane po 8 kolumn w bajcie (n x ceil(n/8)),
+    # "coo" - para tablic (wiersze, kolumny), "csr" - para (przesunięcia, kolumny), "scipy" - scipy.sparse.csr_matrix
+    @memoized()
+    def adjacency_matrix(self, format="dense", remap=True):
+        csr = self.to_csr()
+        if remap:
+            vertex_ids = csr.vertex_ids
+            rows = np.repeat(np.arange(len(vertex_ids)), csr.degree_array())
+            cols = csr.neighbors.astype(np.int64)
+            offsets = csr.offsets
+        else:
+            if len(csr.vertex_ids) and csr.vertex_ids[0] < 0:
+                raise ValueError("Ujemne identyfikatory wierzchołków wymagają remap=True.")
+            vertex_count = int(csr.vertex_ids[-1]) + 1 if len(csr.vertex_ids) else 0
+            vertex_ids = np.arange(vertex_count)
+            rows = np.repeat(csr.vertex_ids, csr.degree_array())
+            cols = csr.vertex_ids[csr.neighbors]
+            offsets = np.zeros(vertex_count + 1, dtype=np.int64)
+            np.cumsum(np.bincount(rows, minlength=vertex_count), out=offsets[1:])
+        vertex_count = len(vertex_ids)
+        if format == "dense":
+            matrix = np.zeros((vertex_count, vertex_count), dtype=np.uint8)
+            matrix[rows, cols] = 1
+        elif format == "bits":
+            matrix = np.zeros((vertex_count, (vertex_count + 7) // 8), dtype=np.uint8)
+            np.bitwise_or.at(matrix, (rows, cols >> 3), (0x80 >> (cols & 7)).astype(np.uint8))
+        elif format == "coo":
+            matrix = (rows, cols)
+        elif format == "csr":
+            matrix = (offsets, cols)
+        elif format == "scipy":
+            try:
+                from scipy.sparse import csr_matrix
+            except ImportError:
+                raise ImportError("Format scipy wymaga zainstalowanego pakietu scipy.") from None
+            matrix = csr_matrix((np.ones(len(cols), dtype=np.uint8), cols, offsets), shape=(vertex_count, vertex_count))
+        else:
+            raise ValueError(f"Nieznany format macierzy {format}, dostępne: dense, bits, coo, csr, scipy")
+        return matrix, vertex_ids
 
     # Przetworzenie listy sąsiedztwa na macierz
     def list_to_matrix(self, adjacency_list=None):
@@ -140,55 +1280,102 @@ class Graph:
                 matrix[vertex][adjusted_neighbor] = 1
         return matrix
     
-    # Wypisanie macierzy sąsiedztwa
+    # Wypisanie macierzy sąsiedztwa - wiersze i kolumny w kolejności przemapowanych identyfikatorów
     def print_matrix(self, adjacency_list=None):
-        adjacency_list = adjacency_list or self.adjacency_list
-        matrix = self.list_to_matrix(adjacency_list)
+        if adjacency_list is not None and adjacency_list is not self.adjacency_list:
+            matrix = self.list_to_matrix(adjacency_list)
+            vertex_ids = range(len(matrix))
+        else:
+            matrix, vertex_ids = self.adjacency_matrix("dense")
         print("Matrix representation of the graph:")
+        vertex_ids = [int(vertex) for vertex in vertex_ids]
+        if vertex_ids != list(range(len(matrix))):
+            print(f"Wierzchołki: {vertex_ids}")
         for row in matrix:
-            print(row)
+            print(list(row) if isinstance(row, list) else row.tolist())
+
+    def has_edge(self, vertex1, vertex2):
+        return vertex1 in self.adjacency_list and vertex2 in self.adjacency_list[vertex1]
 
     # Dodanie krawędzi do listy sąsiedztwa
     def add_edge(self, vertex1, vertex2):
-        if vertex1 in self.adjacency_list and vertex2 in self.adjacency_list[vertex1]:
+        if self.has_edge(vertex1, vertex2):
             print("Krawędź już istnieje.")
         else:
-            if vertex1 not in self.adjacency_list:
-                self.add_vertex(vertex1)
-                self.degrees[vertex1] = 0
-            self.adjacency_list[vertex1].append(vertex2)
-            if vertex2 not in self.adjacency_list:
-                self.add_vertex(vertex2)
-                self.degrees[vertex2] = 0
-            self.adjacency_list[vertex2].append(vertex1)
-            self.degrees[vertex1] += 1
-            self.degrees[vertex2] += 1
+            self._insert_edge(vertex1, vertex2)
+
+    def _insert_edge(self, vertex1, vertex2):
+        self.memo.bump()
+        if vertex1 not in self.adjacency_list:
+            self._new_vertex(vertex1)
+        self.adjacency_list[vertex1].append(vertex2)
+        if vertex2 not in self.adjacency_list:
+            self._new_vertex(vertex2)
+        self.adjacency_list[vertex2].append(vertex1)
+        self._change_degree(vertex1, 1)
+        self._change_degree(vertex2, 1)
+        if self.journal is not None:
+            self.journal.record(GraphJournal.ADD_EDGE, vertex1, vertex2)
 
     # Usunięcie krawędzi z listy sąsiedztwa
     def remove_edge(self, vertex1, vertex2):
+        self.memo.bump()
         if vertex1 in self.adjacency_list and vertex2 in self.adjacency_list[vertex1]:
             self.adjacency_list[vertex1].remove(vertex2)
+            self._change_degree(vertex1, -1)
         if vertex2 in self.adjacency_list and vertex1 in self.adjacency_list[vertex2]:
             self.adjacency_list[vertex2].remove(vertex1)
+            self._change_degree(vertex2, -1)
+        if self.journal is not None:
+            self.journal.record(GraphJournal.REMOVE_EDGE, vertex1, vertex2)
+
+    # Dodanie wielu krawędzi naraz, np. z tablic NumPy - istniejące krawędzie są pomijane bez komunikatu.
+    # Zwraca liczbę dodanych krawędzi
+    def add_edges(self, sources, targets):
+        added = 0
+        for vertex1, vertex2 in zip(np.asarray(sources).tolist(), np.asarray(targets).tolist()):
+            if not self.has_edge(vertex1, vertex2):
+                self._insert_edge(vertex1, vertex2)
+                added += 1
+        return added
+
+    def remove_edges(self, sources, targets):
+        for vertex1, vertex2 in zip(np.asarray(sources).tolist(), np.asarray(targets).tolist()):
+            self.remove_edge(vertex1, vertex2)
 
     # Dodanie wierzchołka do listy sąsiedztwa
     def add_vertex(self, vertex):
         if vertex not in self.adjacency_list:
-            self.adjacency_list[vertex] = []
-            self.degrees[vertex] = 0
+            self._new_vertex(vertex)
+            if self.journal is not None:
+                self.journal.record(GraphJournal.ADD_VERTEX, vertex)
         else:
             print("Wierzchołek już istnieje.")
 
+    # Nowy wierzchołek bez rekordu w dzienniku - przy dodawaniu krawędzi zapisywany jest tylko jej rekord,
+    # już po wykonaniu całej zmiany
+    def _new_vertex(self, vertex):
+        self.memo.bump()
+        self.adjacency_list[vertex] = []
+        self.degrees[vertex] = 0
+        self.degree_histogram.add(0)
+
     # Usunięcie wierzchołka z listy sąsiedztwa
     def remove_vertex(self, vertex):
         if vertex in self.adjacency_list:
+            self.memo.bump()
             del self.adjacency_list[vertex]
-            for neighbors in self.adjacency_list.values():
+            self.degree_histogram.remove(self.degrees.pop(vertex))
+            for neighbor, neighbors in self.adjacency_list.items():
                 if vertex in neighbors:
                     neighbors.remove(vertex)
+                    self._change_degree(neighbor, -1)
+            if self.journal is not None:
+                self.journal.record(GraphJournal.REMOVE_VERTEX, vertex)
 
-    # Odczyt z pliku SNAP
+    # Odczyt z pliku SNAP - krawędź zapisana w obu kierunkach jest dodawana raz, pętla własna jak w add_edge
     def read_snap_file(self, filename):
+        self.memo.bump()
         try:
             with open(filename, "r") as file:
                 for line in file:
@@ -198,15 +1385,62 @@ class Graph:
                     vertex1 = int(vertex[0])
                     vertex2 = int(vertex[1])
                     if vertex1 not in self.adjacency_list:
-                        self.add_vertex(vertex1)
+                        self._new_vertex(vertex1)
                     if vertex2 not in self.adjacency_list:
-                        self.add_vertex(vertex2)
+                        self._new_vertex(vertex2)
                     if vertex2 not in self.adjacency_list[vertex1]:
                         self.adjacency_list[vertex1].append(vertex2)
-                    if vertex1 not in self.adjacency_list[vertex2]:
                         self.adjacency_list[vertex2].append(vertex1)
+                        self._change_degree(vertex1, 1)
+                        self._change_degree(vertex2, 1)
         except FileNotFoundError:
             print(f"Plik {filename} nie został znaleziony.")
+        self._journal_snapshot()
+
+    # Szybkie wczytanie pliku SNAP - plik czytany blokami prosto do tablic liczb, pętle własne są odrzucane,
+    # a powtórzone krawędzie usuwane sortowaniem. Zastępuje bieżącą zawartość grafu
+    def read_snap_file_bulk(self, filename, chunk_size=None, report=True):
+        try:
+            with LoadStats(f"Wczytano {filename}") as stats:
+                csr = CSRGraph.from_snap_edges(*self.parse_snap_edges(filename, chunk_size))
+                all_neighbors = csr.vertex_ids[csr.neighbors].tolist()
+                offsets = csr.offsets.tolist()
+                self.adjacency_list = {vertex: all_neighbors[offsets[index]:offsets[index + 1]]
+                                       for index, vertex in enumerate(csr.vertex_ids.tolist())}
+                self.set_degrees(dict(zip(csr.vertex_ids.tolist(), csr.degree_array().tolist())))
+                stats.edges = csr.num_edges
+        except FileNotFoundError:
+            print(f"Plik {filename} nie został znaleziony.")
+            return None
+        self._journal_snapshot()
+        if report:
+            stats.report()
+        return stats
+
+    # Odczyt krawędzi z pliku SNAP do dwóch tablic int64
+    @classmethod
+    def parse_snap_edges(cls, filename, chunk_size=None):
+        source_parts, target_parts = [], []
+        for sources, targets in cls.iter_snap_chunks(filename, chunk_size):
+            source_parts.append(sources)
+            target_parts.append(targets)
+        if not source_parts:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        return np.concatenate(source_parts), np.concatenate(target_parts)
+
+    # Krawędzie z pliku SNAP blok po bloku - w pamięci jest tylko jeden blok pełnych linii naraz.
+    # Kolumny za źródłem i celem (np. wagi) są pomijane
+    @classmethod
+    def iter_snap_chunks(cls, filename, chunk_size=None):
+        for values in iter_number_blocks(filename, 2, np.int64, chunk_size or cls.SNAP_CHUNK_SIZE, extra_columns=True):
+            yield values[:, 0], values[:, 1]
+
+    # Wczytania całego pliku lub macierzy nie trafiają do dziennika zmian rekord po rekordzie -
+    # przy dołączonym dzienniku zapisywana jest od razu nowa migawka
+    def _journal_snapshot(self):
+        if self.journal is not None:
+            self.journal.compact()
 
     # Zapis do pliku w formacie SNAP
     def write_snap_file(self, filename):
@@ -221,180 +1455,1566 @@ class Graph:
     def calculate_degrees(self, adjacency_list=None):
         if adjacency_list is None:
             adjacency_list = self.adjacency_list
-        self.degrees = {}
-        for vertex, neighbors in adjacency_list.items():
-            self.degrees[vertex] = len(neighbors)
+        self.set_degrees({vertex: len(neighbors) for vertex, neighbors in adjacency_list.items()})
     
-    # Wyszukiwanie wszystkich ścieżek o zadanej długości
-    def dfs_paths(self, start_vertex, path=[], path_length=0, target_length=3):
+    # Wyszukiwanie wszystkich ścieżek o zadanej długości zaczynających się w danym wierzchołku
+    def dfs_paths(self, start_vertex, path=None, path_length=0, target_length=3):
+        if path is None:
+            path = []
         path.append(start_vertex)
         paths = []
         if path_length == target_length:
             paths.append(path.copy())
-        for neighbor in self.adjacency_list[start_vertex]:
-            if neighbor not in path:
-                paths.extend(
-                    self.dfs_paths(neighbor, path, path_length + 1, target_length)
-                )
+        else:
+            for neighbor in self.adjacency_list[start_vertex]:
+                if neighbor not in path:
+                    paths.extend(
+                        self.dfs_paths(neighbor, path, path_length + 1, target_length)
+                    )
         path.pop()
         return paths
 
     def all_dfs_paths(self, target_length=3):
-        all_paths = []
-        total_count = 0
-        for start_vertex in self.adjacency_list:
-            paths = self.dfs_paths(start_vertex, target_length=target_length)
-            total_count += len(paths)
-            all_paths.extend(paths)
+        all_paths = list(self.iter_paths(target_length))
+        total_count = len(all_paths)
         print(f"Całkowita liczba ścieżek {target_length}: {total_count/2}")
         return all_paths
-    
-    # Wyliczanie liczby anihilacji
+
+    # Lista sąsiedztwa przepisana na gęste indeksy 0..n-1: (lista wierzchołków, listy indeksów sąsiadów)
+    @memoized()
+    def _dense_adjacency(self):
+        vertices = list(self.adjacency_list)
+        index_of = {vertex: index for index, vertex in enumerate(vertices)}
+        neighbor_lists = [[index_of[neighbor] for neighbor in neighbors if neighbor in index_of]
+                          for neighbors in self.adjacency_list.values()]
+        return vertices, neighbor_lists
+
+    # Leniwe generowanie ścieżek prostych o zadanej długości - iteracyjny DFS z tablicą odwiedzin.
+    # Każda ścieżka jest zwracana w obu kierunkach jak w all_dfs_paths, przy unique=True tylko raz
+    def iter_paths(self, target_length=3, unique=False, start_vertices=None):
+        vertices, neighbor_lists = self._dense_adjacency()
+        if start_vertices is None:
+            starts = range(len(vertices))
+        else:
+            index_of = {vertex: index for index, vertex in enumerate(vertices)}
+            starts = [index_of[vertex] for vertex in start_vertices]
+        visited = bytearray(len(vertices))
+        for start in starts:
+            for path in self._paths_from(start, neighbor_lists, visited, target_length, unique):
+                yield [vertices[index] for index in path]
+
+    # Ścieżki z jednego wierzchołka jako listy gęstych indeksów, iteracyjny DFS z tablicą odwiedzin
+    @staticmethod
+    def _paths_from(start, neighbor_lists, visited, target_length, unique=False):
+        if target_length == 0:
+            yield [start]
+            return
+        visited[start] = 1
+        path = [start]
+        stack = [iter(neighbor_lists[start])]
+        while stack:
+            for neighbor in stack[-1]:
+                if visited[neighbor]:
+                    continue
+                if len(path) == target_length:
+                    if not unique or start < neighbor:
+                        yield path + [neighbor]
+                    continue
+                visited[neighbor] = 1
+                path.append(neighbor)
+                stack.append(iter(neighbor_lists[neighbor]))
+                break
+            else:
+                stack.pop()
+                visited[path.pop()] = 0
+
+    # Liczba ścieżek prostych o zadanej długości (każda liczona raz), bez budowania list ścieżek.
+    # Dla długości 1-3 wzory oparte na stopniach i trójkątach (graf nieskierowany), dla dłuższych DFS liczący
+    @memoized()
+    def count_paths(self, target_length=3, method="auto"):
+        vertices, neighbor_lists = self._dense_adjacency()
+        if target_length == 0:
+            return len(vertices)
+        if method == "auto":
+            method = "formula" if target_length <= 3 else "dfs"
+        if method == "formula":
+            return self._count_paths_formula(neighbor_lists, target_length)
+        if method != "dfs":
+            raise ValueError(f"Nieznana metoda {method}, dostępne: auto, formula, dfs")
+        visited = bytearray(len(vertices))
+        total_count = 0
+        for start in range(len(vertices)):
+            total_count += self._count_paths_from(start, neighbor_lists, visited, target_length)
+        return total_count // 2
+
+    # DFS liczący ścieżki z jednego wierzchołka, ostatni poziom zliczany bez schodzenia w głąb
+    @staticmethod
+    def _count_paths_from(start, neighbor_lists, visited, target_length):
+        visited[start] = 1
+        if target_length == 1:
+            count = sum(1 for neighbor in neighbor_lists[start] if not visited[neighbor])
+            visited[start] = 0
+            return count
+        count = 0
+        path = [start]
+        stack = [iter(neighbor_lists[start])]
+        while stack:
+            for neighbor in stack[-1]:
+                if visited[neighbor]:
+                    continue
+                visited[neighbor] = 1
+                if len(path) + 1 == target_length:
+                    count += sum(1 for last in neighbor_lists[neighbor] if not visited[last])
+                    visited[neighbor] = 0
+                    continue
+                path.append(neighbor)
+                stack.append(iter(neighbor_lists[neighbor]))
+                break
+            else:
+                stack.pop()
+                visited[path.pop()] = 0
+        return count
+
+    # Równoległe liczenie (count_only=True) albo wyznaczanie ścieżek - wierzchołki startowe dzielone są między
+    # procesy puli. Graf trafia do procesu raz, przez inicjalizator puli, a zadania niosą tylko indeksy startów.
+    # Porcje ułożone od najcięższych według szacowanej pracy, wolne procesy zabierają kolejne (imap_unordered).
+    # Przyspieszenie to łączny czas procesora zadań (odpowiednik przebiegu szeregowego) przez czas całkowity
+    def parallel_paths(self, target_length=3, processes=None, count_only=True, report=True):
+        vertices, neighbor_lists = self._dense_adjacency()
+        processes = processes or os.cpu_count() or 1
+        chunks = self._path_chunks(neighbor_lists, target_length, processes)
+        results = {}
+        task_seconds = 0.0
+        start_time = perf_counter()
+        with worker_pool(processes, Graph._paths_in_chunk, (neighbor_lists, target_length, count_only)) as pool:
+            for chunk_results, seconds in pool.imap_unordered(_worker_task, chunks):
+                results.update(chunk_results)
+                task_seconds += seconds
+        wall_seconds = perf_counter() - start_time
+        self.parallel_stats = {"processes": processes, "chunks": len(chunks), "wall_seconds": wall_seconds,
+                               "task_seconds": task_seconds,
+                               "speedup": task_seconds / wall_seconds if wall_seconds > 0 else 0.0}
+        if report:
+            print(f"Ścieżki długości {target_length}: {processes} procesów, {len(chunks)} porcji, "
+                  f"czas {wall_seconds:.3f} s, łączny czas procesora zadań {task_seconds:.3f} s, "
+                  f"przyspieszenie {self.parallel_stats['speedup']:.2f}x")
+        if count_only:
+            total_count = sum(results.values())
+            return total_count // 2 if target_length else total_count
+        return [[vertices[index] for index in path]
+                for start in range(len(vertices)) for path in results.get(start, ())]
+
+    # Zadanie procesu roboczego parallel_paths - ścieżki albo ich liczby dla porcji startów i czas procesora porcji
+    @staticmethod
+    def _paths_in_chunk(state, starts):
+        neighbor_lists, target_length, count_only = state
+        visited = bytearray(len(neighbor_lists))
+        start_time = process_time()
+        results = {}
+        for start in starts:
+            if not count_only:
+                results[start] = list(Graph._paths_from(start, neighbor_lists, visited, target_length))
+            elif target_length == 0:
+                results[start] = 1
+            else:
+                results[start] = Graph._count_paths_from(start, neighbor_lists, visited, target_length)
+        return results, process_time() - start_time
+
+    # Podział wierzchołków startowych na porcje o zbliżonej szacowanej pracy. Praca startu szacowana
+    # liczbą ścieżek długości 2 (suma stopni sąsiadów), więc huby trafiają do osobnych, wczesnych porcji
+    @staticmethod
+    def _path_chunks(neighbor_lists, target_length, processes):
+        degrees = [len(neighbors) for neighbors in neighbor_lists]
+        if target_length >= 2:
+            weights = [1 + sum(degrees[neighbor] for neighbor in neighbors) for neighbors in neighbor_lists]
+        else:
+            weights = [1 + degree for degree in degrees]
+        order = sorted(range(len(neighbor_lists)), key=weights.__getitem__, reverse=True)
+        chunk_weight = sum(weights) / (processes * 8) if order else 0
+        chunks, chunk, weight = [], [], 0
+        for start in order:
+            chunk.append(start)
+            weight += weights[start]
+            if weight >= chunk_weight:
+                chunks.append(chunk)
+                chunk, weight = [], 0
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    # Ścieżki długości 1: liczba krawędzi, 2: suma C(d, 2) po środkowym wierzchołku,
+    # 3: suma (d_u - 1)(d_v - 1) po krawędziach minus 3 razy liczba trójkątów
+    @staticmethod
+    def _count_paths_formula(neighbor_lists, target_length):
+        neighbor_sets = [set(neighbors) - {vertex} for vertex, neighbors in enumerate(neighbor_lists)]
+        degrees = [len(neighbors) for neighbors in neighbor_sets]
+        if target_length == 1:
+            return sum(degrees) // 2
+        if target_length == 2:
+            return sum(degree * (degree - 1) // 2 for degree in degrees)
+        if target_length != 3:
+            raise ValueError("Wzory są dostępne tylko dla ścieżek długości 1-3.")
+        count = 0
+        for vertex, neighbors in enumerate(neighbor_sets):
+            for neighbor in neighbors:
+                if vertex < neighbor:
+                    count += (degrees[vertex] - 1) * (degrees[neighbor] - 1)
+                    count -= len(neighbors & neighbor_sets[neighbor])
+        return count
+
+    # Spójne składowe (krawędzie traktowane jako nieskierowane), od największej - union-find na indeksach wierzchołków
+    @memoized()
+    def connected_components(self):
+        vertices, neighbor_lists = self._dense_adjacency()
+        components = UnionFind(len(vertices))
+        for index, neighbors in enumerate(neighbor_lists):
+            for neighbor in neighbors:
+                components.union(index, neighbor)
+        return [[vertices[index] for index in group] for group in components.groups()]
+
+    # Numer składowej każdego wierzchołka, 0 to składowa największa
+    def component_labels(self):
+        return {vertex: label for label, component in enumerate(self.connected_components()) for vertex in component}
+
+    # Odległości w liczbie krawędzi od wierzchołka start (BFS poziomami, bez rekurencji), opcjonalnie do max_depth
+    def bfs_distances(self, start, max_depth=None):
+        return self.bfs_levels(self.adjacency_list, start, max_depth)
+
+    @staticmethod
+    def bfs_levels(adjacency_list, start, max_depth=None, target=None):
+        if start not in adjacency_list:
+            raise KeyError(start)
+        distances = {start: 0}
+        frontier = [start]
+        depth = 0
+        while frontier and target not in distances and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier = []
+            for vertex in frontier:
+                for neighbor in adjacency_list.get(vertex, ()):
+                    if neighbor not in distances:
+                        distances[neighbor] = depth
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return distances
+
+    # Najkrótsza odległość w liczbie krawędzi, None gdy target jest nieosiągalny - BFS kończy się po dotarciu do celu
+    def shortest_path_length(self, start, target):
+        return self.bfs_levels(self.adjacency_list, start, target=target).get(target)
+
+    # Liczba trójkątów przy każdym wierzchołku (w kolejności vertex_ids grafu CSR) oraz stopnie bez pętli i powtórzeń.
+    # Wierzchołki numerowane rosnąco według stopnia, każda krawędź skierowana do wierzchołka o wyższym numerze,
+    # więc listy wychodzące mają najwyżej O(sqrt(m)) elementów. Trójkąt to para sąsiadów v < w z listy u,
+    # dla której krawędź (v, w) istnieje - sprawdzane wyszukiwaniem binarnym w posortowanych kluczach krawędzi.
+    # Pary generowane porcjami po TRIANGLE_CHUNK_SIZE, przy processes > 1 porcje liczone w puli procesów
+    TRIANGLE_CHUNK_SIZE = 1 << 22
+
+    @memoized("processes")
+    def _triangle_counts(self, processes=1):
+        csr = self.to_csr()
+        vertex_count = len(csr.vertex_ids)
+        degrees = np.diff(csr.offsets)
+        rank = np.empty(vertex_count, dtype=np.int64)
+        rank[np.argsort(degrees, kind="stable")] = np.arange(vertex_count)
+        sources = rank[np.repeat(np.arange(vertex_count), degrees)]
+        targets = rank[csr.neighbors]
+        keep = sources != targets
+        low = np.minimum(sources[keep], targets[keep])
+        high = np.maximum(sources[keep], targets[keep])
+        keys = CSRGraph.sorted_unique(low * vertex_count + high)
+        low = keys // max(vertex_count, 1)
+        high = keys % max(vertex_count, 1)
+        simple_degrees = np.bincount(np.concatenate((low, high)), minlength=vertex_count)[rank]
+        row_ends = np.cumsum(np.bincount(low, minlength=vertex_count))[low]
+        pair_counts = row_ends - np.arange(len(keys)) - 1
+        chunk_size = self.TRIANGLE_CHUNK_SIZE
+        if processes > 1:
+            chunk_size = max(1, min(chunk_size, int(pair_counts.sum()) // (processes * 8)))
+        chunks = self._triangle_chunks(pair_counts, chunk_size)
+        state = (low, high, keys, pair_counts, vertex_count)
+        if processes > 1 and len(chunks) > 1:
+            with worker_pool(processes, Graph._triangles_in_chunk, state) as pool:
+                counts = sum(pool.imap_unordered(_worker_task, chunks), np.zeros(vertex_count, np.int64))
+        else:
+            counts = np.zeros(vertex_count, dtype=np.int64)
+            for chunk in chunks:
+                counts += self._triangles_in_chunk(state, chunk)
+        return csr.vertex_ids, simple_degrees, counts[rank]
+
+    # Podział krawędzi na ciągłe zakresy - nowy zakres zaczyna się, gdy pary kolejnej krawędzi
+    # zaczynają się w następnym oknie chunk_size par
+    @staticmethod
+    def _triangle_chunks(pair_counts, chunk_size):
+        if len(pair_counts) == 0:
+            return []
+        windows = (np.cumsum(pair_counts) - pair_counts) // chunk_size
+        starts = np.flatnonzero(np.diff(windows)) + 1
+        bounds = [0, *starts.tolist(), len(pair_counts)]
+        return list(zip(bounds, bounds[1:]))
+
+    # Trójkąty z par sąsiadów krawędzi z zakresu chunk; zwraca liczbę trójkątów przy każdym wierzchołku (numery rang)
+    @staticmethod
+    def _triangles_in_chunk(state, chunk):
+        low, high, keys, pair_counts, vertex_count = state
+        start, end = chunk
+        counts = pair_counts[start:end]
+        first = np.repeat(np.arange(start, end), counts)
+        pair_starts = np.cumsum(counts) - counts
+        second = first + np.arange(len(first)) - np.repeat(pair_starts, counts) + 1
+        wanted = high[first] * vertex_count + high[second]
+        positions = np.minimum(np.searchsorted(keys, wanted), len(keys) - 1)
+        found = keys[positions] == wanted if len(keys) else np.zeros(0, dtype=bool)
+        corners = np.concatenate((low[first[found]], high[first[found]], high[second[found]]))
+        return np.bincount(corners, minlength=vertex_count)
+
+    def triangles_per_vertex(self, processes=1):
+        vertex_ids, _, counts = self._triangle_counts(processes)
+        return dict(zip(vertex_ids.tolist(), counts.tolist()))
+
+    def count_triangles(self, processes=1):
+        return int(self._triangle_counts(processes)[2].sum()) // 3
+
+    # Lokalny współczynnik gronowania: trójkąty wierzchołka przez liczbę par jego sąsiadów (0 dla stopnia < 2)
+    def clustering_coefficients(self, processes=1):
+        vertex_ids, degrees, counts = self._triangle_counts(processes)
+        pairs = degrees * (degrees - 1) / 2
+        coefficients = np.divide(counts, pairs, out=np.zeros(len(counts)), where=pairs > 0)
+        return dict(zip(vertex_ids.tolist(), coefficients.tolist()))
+
+    def average_clustering(self, processes=1):
+        coefficients = self.clustering_coefficients(processes)
+        return sum(coefficients.values()) / len(coefficients) if coefficients else 0.0
+
+    # Tranzytywność: 3 * liczba trójkątów / liczba ścieżek długości 2
+    def transitivity(self, processes=1):
+        _, degrees, counts = self._triangle_counts(processes)
+        pairs = int((degrees * (degrees - 1) // 2).sum())
+        return int(counts.sum()) / pairs if pairs else 0.0
+
+    # Wyliczanie liczby anihilacji z utrzymywanego histogramu stopni - koszt zależy od liczby różnych stopni
+    @memoized("adjacency_list")
     def annihilation_number(self, adjacency_list=None):
-        adjacency_list = adjacency_list or self.adjacency_list
-        degrees = [len(neighbors) for neighbors in self.adjacency_list.values()]
-        degrees.sort()
-        num_edges = (
-            sum(len(neighbors) for neighbors in self.adjacency_list.values()) // 2
-        )
-        annihilation_num = 0
-        for degree in degrees:
-            annihilation_num += degree
-            if annihilation_num >= num_edges:
-                return min(annihilation_num, num_edges)
-            self.annih_number = annihilation_num
-        return annihilation_num
-    
-    # Wyliczanie potencjału grafu
+        return self.degree_histogram.annihilation()[0]
+
+    # Reguła liczby anihilacji na tablicy stopni: stopnie rosnąco sumowane aż suma osiągnie liczbę krawędzi.
+    # Zwraca wynik oraz ostatnią sumę prefiksową mniejszą od liczby krawędzi (None, jeśli takiej nie ma)
+    @staticmethod
+    def annihilation_from_degrees(degrees):
+        degrees = np.sort(np.asarray(degrees, dtype=np.int64))
+        if len(degrees) == 0:
+            return 0, None
+        num_edges = int(degrees.sum()) // 2
+        prefix_sums = np.cumsum(degrees)
+        crossing = int(np.searchsorted(prefix_sums, num_edges, side="left"))
+        last_prefix = int(prefix_sums[crossing - 1]) if crossing > 0 else None
+        if crossing == len(prefix_sums):
+            return int(prefix_sums[-1]), last_prefix
+        return min(int(prefix_sums[crossing]), num_edges), last_prefix
+
+    # Wyliczanie potencjału grafu - potencjał wierzchołka równy jest jego stopniowi
     def find_potential(self, degrees=None):
-        degrees = degrees or self.degrees
-        potentials = {}
-        for v,degree in self.degrees.items():
-            potential = 0
-            for i in range(
-                1, degree + 1
-            ):
-                if i <= degree:
-                    potential = i
-                else:
-                    break
-            potentials[v] = potential
-        return potentials
+        return dict(self.degrees)
 
     def graph_potential(self):
-        self.poten = self.find_potential()
-        max_potential = max(self.poten.values())
-        self.poten = max_potential
-        return max_potential            
+        return self.poten
 
-class Statistics:
-    TimeAdjListDefault: float
-    TimeDegDefault: float
-    TimeAddVertexDefault: float
-    TimeAnnihilationDefault: float
-    TimePotentialDefault: float
-    TimeAdjListFile: float
-    TimeDegFile: float
-    TimeAddVertFile: float
-    TimeAnnihilationFile: float
-    TimePotentialFile: float
+    # Zamiana na zwartą, niemodyfikowalną reprezentację CSR
+    @memoized()
+    def to_csr(self):
+        return CSRGraph.from_adjacency_list(self.adjacency_list)
+
+    # Zapis do binarnego pliku CSR (format opisany przy CSRGraph.write_binary_file)
+    def write_binary_file(self, filename):
+        self.to_csr().write_binary_file(filename)
+
+# Widok listy sąsiedztwa grafu CSR - zachowuje się jak słownik {wierzchołek: [sąsiedzi]}
+class CSRAdjacencyView(Mapping):
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, vertex):
+        return self.graph.neighbors_of(vertex).tolist()
+
+    def __iter__(self):
+        return iter(self.graph.vertex_ids.tolist())
+
+    def __len__(self):
+        return len(self.graph.vertex_ids)
+
+    def __contains__(self, vertex):
+        return self.graph.find_index(vertex) is not None
+
+# Graf w formacie CSR - tablica przesunięć i tablica sąsiadów, identyfikatory wierzchołków
+# przemapowane na gęsty zakres 0..n-1 (vertex_ids trzyma posortowane oryginalne identyfikatory).
+# Graf jest niemodyfikowalny, zmiany wykonuje się na kopii z to_graph()
+class CSRGraph(Graph):
+    # Binarny format grafu: nagłówek (sygnatura, wersja, flagi, liczba wierzchołków, liczba łuków),
+    # potem vertex_ids int64[n], offsets int64[n + 1] i neighbors int32[łuki], little-endian
+    BINARY_MAGIC = b"GRAFCSR\0"
+    BINARY_VERSION = 1
+    BINARY_HEADER = struct.Struct("<8sIIQQ")
+    BINARY_EXTENSION = ".gcsr"
+    SNAP_WRITE_ROWS = 1 << 16
+
+    def __init__(self, vertex_ids, offsets, neighbors):
+        self.vertex_ids = np.ascontiguousarray(vertex_ids, dtype=np.int64)
+        self.offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+        self.neighbors = np.ascontiguousarray(neighbors, dtype=np.int32)
+        self.adjacency_list = CSRAdjacencyView(self)
+        self.degrees = {}
+        self.memo = MemoCache()
+        self.journal = None
+
+    # Posortowane wartości bez powtórzeń - sortowanie i maska sąsiednich różnic,
+    # wyraźnie szybsze od np.unique na dużych tablicach
+    @staticmethod
+    def sorted_unique(values):
+        values = np.sort(values)
+        if len(values) == 0:
+            return values
+        keep = np.empty(len(values), dtype=bool)
+        keep[0] = True
+        np.not_equal(values[1:], values[:-1], out=keep[1:])
+        return values[keep]
+
+    # Budowa z łuków skierowanych (oryginalne identyfikatory), powtórzenia są usuwane przez sortowanie
+    @classmethod
+    def from_arcs(cls, sources, targets, vertex_ids=None):
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if vertex_ids is None:
+            vertex_ids = cls.sorted_unique(np.concatenate((sources, targets)))
+        vertex_count = len(vertex_ids)
+        keys = cls.sorted_unique(np.searchsorted(vertex_ids, sources) * vertex_count
+                         + np.searchsorted(vertex_ids, targets))
+        offsets = np.zeros(vertex_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // max(vertex_count, 1), minlength=vertex_count), out=offsets[1:])
+        return cls(vertex_ids, offsets, keys % max(vertex_count, 1))
+
+    # Budowa z krawędzi nieskierowanych - każda krawędź trafia do list obu końców
+    @classmethod
+    def from_edges(cls, sources, targets, vertex_ids=None):
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        return cls.from_arcs(np.concatenate((sources, targets)), np.concatenate((targets, sources)), vertex_ids)
+
+    @classmethod
+    def from_adjacency_list(cls, adjacency_list):
+        vertices = np.fromiter(adjacency_list.keys(), dtype=np.int64, count=len(adjacency_list))
+        lengths = [len(neighbors) for neighbors in adjacency_list.values()]
+        sources = np.repeat(vertices, lengths)
+        targets = np.fromiter((neighbor for neighbors in adjacency_list.values() for neighbor in neighbors),
+                              dtype=np.int64, count=sum(lengths))
+        return cls.from_arcs(sources, targets, cls.sorted_unique(np.concatenate((vertices, targets))))
+
+    # Krawędzie z pliku SNAP bez pętli własnych - powtórzenia usuwa sortowanie w from_arcs
+    @classmethod
+    def from_snap_edges(cls, sources, targets):
+        keep = sources != targets
+        return cls.from_edges(sources[keep], targets[keep])
+
+    # Szybkie wczytanie pliku SNAP wprost do grafu CSR
+    @classmethod
+    def from_snap_file(cls, filename, chunk_size=None, report=True):
+        with LoadStats(f"Wczytano {filename}") as stats:
+            graph = cls.from_snap_edges(*cls.parse_snap_edges(filename, chunk_size))
+            stats.edges = graph.num_edges
+        if report:
+            stats.report()
+        graph.load_stats = stats
+        return graph
+
+    def write_binary_file(self, filename, report=True):
+        with open(filename, "wb") as file:
+            file.write(self.BINARY_HEADER.pack(self.BINARY_MAGIC, self.BINARY_VERSION, 0,
+                                               len(self.vertex_ids), len(self.neighbors)))
+            for array, dtype in ((self.vertex_ids, "<i8"), (self.offsets, "<i8"), (self.neighbors, "<i4")):
+                file.write(np.ascontiguousarray(array, dtype=dtype).tobytes())
+        if report:
+            print(f"Graf CSR zapisany do pliku o nazwie {filename}\n")
+
+    # Zapis SNAP prosto z tablic, porcjami po SNAP_WRITE_ROWS wierszy - każda krawędź w obu kierunkach,
+    # jak w Graph.write_snap_file
+    def write_snap_file(self, filename, report=True):
+        sources = np.repeat(self.vertex_ids, self.degree_array())
+        targets = self.vertex_ids[self.neighbors]
+        with open(filename, "w") as file:
+            for start in range(0, len(targets), self.SNAP_WRITE_ROWS):
+                end = start + self.SNAP_WRITE_ROWS
+                file.write("".join(map("%d\t%d\n".__mod__, zip(sources[start:end].tolist(), targets[start:end].tolist()))))
+        if report:
+            print(f"Lista sąsiedztw zapisana do pliku o nazwie {filename}\n")
+
+    # Odczyt binarnego pliku CSR. Przy mmap=True tablice są widokami na plik zmapowany w pamięci -
+    # otwarcie nie kopiuje danych, a strony pliku są współdzielone przez procesy czytające ten sam plik
+    @classmethod
+    def read_binary_file(cls, filename, mmap=True):
+        if mmap:
+            data = np.memmap(filename, dtype=np.uint8, mode="r")
+        else:
+            data = np.fromfile(filename, dtype=np.uint8)
+        header_size = cls.BINARY_HEADER.size
+        if len(data) < header_size:
+            raise ValueError(f"Plik {filename} jest za krótki na nagłówek grafu CSR.")
+        magic, version, _, vertex_count, arc_count = cls.BINARY_HEADER.unpack(data[:header_size].tobytes())
+        if magic != cls.BINARY_MAGIC:
+            raise ValueError(f"Plik {filename} nie jest binarnym plikiem grafu CSR.")
+        if version != cls.BINARY_VERSION:
+            raise ValueError(f"Nieobsługiwana wersja pliku grafu CSR: {version}.")
+        sections = []
+        position = header_size
+        for count, dtype in ((vertex_count, np.dtype("<i8")), (vertex_count + 1, np.dtype("<i8")), (arc_count, np.dtype("<i4"))):
+            end = position + count * dtype.itemsize
+            if end > len(data):
+                raise ValueError(f"Plik {filename} jest uszkodzony - brakuje danych grafu.")
+            sections.append(data[position:end].view(dtype))
+            position = end
+        return cls(*sections)
+
+    # Konwersja pliku SNAP na binarny plik CSR, domyślnie obok źródła z rozszerzeniem .gcsr
+    @classmethod
+    def convert_snap_file(cls, snap_filename, binary_filename=None, chunk_size=None):
+        binary_filename = binary_filename or os.path.splitext(snap_filename)[0] + cls.BINARY_EXTENSION
+        cls.from_snap_file(snap_filename, chunk_size).write_binary_file(binary_filename)
+        return binary_filename
+
+    # Zamiana z powrotem na modyfikowalny graf oparty na słowniku list - pętla własna wraca do listy dwa razy
+    def to_graph(self):
+        graph = Graph()
+        for vertex, neighbors in self.adjacency_list.items():
+            if vertex in neighbors:
+                neighbors.insert(neighbors.index(vertex), vertex)
+            graph.adjacency_list[vertex] = neighbors
+        graph.calculate_degrees()
+        return graph
+
+    def to_csr(self):
+        return self
+
+    @property
+    def num_edges(self):
+        return int(self.offsets[-1]) // 2
+
+    # Indeks gęsty wierzchołka albo None, wyszukiwanie binarne po posortowanych identyfikatorach
+    def find_index(self, vertex):
+        index = int(np.searchsorted(self.vertex_ids, vertex))
+        if index < len(self.vertex_ids) and self.vertex_ids[index] == vertex:
+            return index
+        return None
+
+    def neighbors_of(self, vertex):
+        index = self.find_index(vertex)
+        if index is None:
+            raise KeyError(vertex)
+        return self.vertex_ids[self.neighbors[self.offsets[index]:self.offsets[index + 1]]]
+
+    # Sprawdzenie krawędzi wyszukiwaniem binarnym w posortowanym wierszu
+    def has_edge(self, vertex1, vertex2):
+        index1 = self.find_index(vertex1)
+        index2 = self.find_index(vertex2)
+        if index1 is None or index2 is None:
+            return False
+        row = self.neighbors[self.offsets[index1]:self.offsets[index1 + 1]]
+        position = int(np.searchsorted(row, index2))
+        return position < len(row) and row[position] == index2
+
+    def degree_array(self):
+        return np.diff(self.offsets)
+
+    # Stopnie wierzchołków - wiersz CSR trzyma pętlę własną raz, a do stopnia liczy się ona podwójnie, jak w Graph
+    def vertex_degrees(self):
+        lengths = self.degree_array()
+        sources = np.repeat(np.arange(len(self.vertex_ids)), lengths)
+        return lengths + np.bincount(sources[sources == self.neighbors], minlength=len(self.vertex_ids))
+
+    @memoized()
+    def _dense_adjacency(self):
+        all_neighbors = self.neighbors.tolist()
+        offsets = self.offsets.tolist()
+        return self.vertex_ids.tolist(), [all_neighbors[offsets[index]:offsets[index + 1]]
+                                          for index in range(len(offsets) - 1)]
+
+    def calculate_degrees(self, adjacency_list=None):
+        if adjacency_list is not None and adjacency_list is not self.adjacency_list:
+            return super().calculate_degrees(adjacency_list)
+        self.degrees = dict(zip(self.vertex_ids.tolist(), self.vertex_degrees().tolist()))
+
+    # Składowe przez union-find na krawędziach (i < j) - bez budowania list sąsiadów
+    @memoized()
+    def connected_components(self):
+        sources = np.repeat(np.arange(len(self.vertex_ids)), self.degree_array())
+        keep = sources < self.neighbors
+        components = UnionFind(len(self.vertex_ids))
+        components.union_pairs(zip(sources[keep].tolist(), self.neighbors[keep].tolist()))
+        vertex_ids = self.vertex_ids.tolist()
+        return [[vertex_ids[index] for index in group] for group in components.groups()]
+
+    # BFS poziomami na tablicach - cały poziom rozwijany naraz przez offsets, odwiedzone w tablicy odległości
+    def bfs_distances(self, start, max_depth=None):
+        index = self.find_index(start)
+        if index is None:
+            raise KeyError(start)
+        distances = self._bfs_array(index, max_depth)
+        reached = np.flatnonzero(distances >= 0)
+        return dict(zip(self.vertex_ids[reached].tolist(), distances[reached].tolist()))
+
+    def shortest_path_length(self, start, target):
+        index = self.find_index(start)
+        if index is None:
+            raise KeyError(start)
+        target_index = self.find_index(target)
+        if target_index is None:
+            return None
+        distance = int(self._bfs_array(index, target_index=target_index)[target_index])
+        return distance if distance >= 0 else None
+
+    def _bfs_array(self, index, max_depth=None, target_index=None):
+        distances = np.full(len(self.vertex_ids), -1, dtype=np.int64)
+        distances[index] = 0
+        frontier = np.array([index], dtype=np.int64)
+        depth = 0
+        while len(frontier) and (max_depth is None or depth < max_depth):
+            if target_index is not None and distances[target_index] >= 0:
+                break
+            depth += 1
+            starts = self.offsets[frontier]
+            lengths = self.offsets[frontier + 1] - starts
+            positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(int(lengths.sum()))
+            candidates = self.neighbors[positions]
+            candidates = CSRGraph.sorted_unique(candidates[distances[candidates] < 0])
+            distances[candidates] = depth
+            frontier = candidates.astype(np.int64)
+        return distances
+
+    # Histogram budowany przy pierwszym użyciu, żeby otwarcie grafu z pliku nie liczyło stopni
+    @cached_property
+    def degree_histogram(self):
+        return DegreeHistogram.from_array(self.vertex_degrees())
+
+    # Potencjał wierzchołka równy jest jego stopniowi
+    def find_potential(self, degrees=None):
+        return dict(zip(self.vertex_ids.tolist(), self.vertex_degrees().tolist()))
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("Graf CSR jest niemodyfikowalny, użyj to_graph() aby go zmienić.")
+
+    matrix_to_list = _immutable
+    add_edge = _immutable
+    add_edges = _immutable
+    remove_edge = _immutable
+    remove_edges = _immutable
+    add_vertex = _immutable
+    remove_vertex = _immutable
+    read_snap_file = _immutable
+
+# Modyfikowalny graf nieskierowany z sąsiadami w zbiorach - sprawdzenie, dodanie i usunięcie krawędzi w O(1),
+# a usunięcie wierzchołka dotyka tylko jego sąsiadów. Pętla własna jest zapisana w zbiorze raz,
+# ale do stopnia liczy się podwójnie, jak w Graph
+class SetGraph(Graph):
+    @classmethod
+    def from_graph(cls, graph):
+        set_graph = cls()
+        set_graph.adjacency_list = {vertex: set(neighbors) for vertex, neighbors in graph.adjacency_list.items()}
+        set_graph.calculate_degrees()
+        return set_graph
+
+    def _insert_edge(self, vertex1, vertex2):
+        self.memo.bump()
+        if vertex1 not in self.adjacency_list:
+            self._new_vertex(vertex1)
+        if vertex2 not in self.adjacency_list:
+            self._new_vertex(vertex2)
+        self.adjacency_list[vertex1].add(vertex2)
+        self.adjacency_list[vertex2].add(vertex1)
+        self._change_degree(vertex1, 1)
+        self._change_degree(vertex2, 1)
+        if self.journal is not None:
+            self.journal.record(GraphJournal.ADD_EDGE, vertex1, vertex2)
+
+    def remove_edge(self, vertex1, vertex2):
+        self.memo.bump()
+        if self.has_edge(vertex1, vertex2):
+            self.adjacency_list[vertex1].discard(vertex2)
+            self.adjacency_list[vertex2].discard(vertex1)
+            self._change_degree(vertex1, -1)
+            self._change_degree(vertex2, -1)
+        if self.journal is not None:
+            self.journal.record(GraphJournal.REMOVE_EDGE, vertex1, vertex2)
+
+    def _new_vertex(self, vertex):
+        self.memo.bump()
+        self.adjacency_list[vertex] = set()
+        self.degrees[vertex] = 0
+        self.degree_histogram.add(0)
+
+    def remove_vertex(self, vertex):
+        if vertex in self.adjacency_list:
+            self.memo.bump()
+            neighbors = self.adjacency_list.pop(vertex)
+            self.degree_histogram.remove(self.degrees.pop(vertex))
+            for neighbor in neighbors:
+                if neighbor != vertex and vertex in self.adjacency_list[neighbor]:
+                    self.adjacency_list[neighbor].remove(vertex)
+                    self._change_degree(neighbor, -1)
+            if self.journal is not None:
+                self.journal.record(GraphJournal.REMOVE_VERTEX, vertex)
+
+    def calculate_degrees(self, adjacency_list=None):
+        if adjacency_list is None:
+            adjacency_list = self.adjacency_list
+        self.set_degrees({vertex: len(neighbors) + (vertex in neighbors)
+                          for vertex, neighbors in adjacency_list.items()})
+
+    def matrix_to_list(self, matrix, vertex_ids=None, packed=False):
+        super().matrix_to_list(matrix, vertex_ids, packed)
+        self._lists_to_sets()
+
+    # Krawędzie wczytywane bez rekordów w dzienniku - po wczytaniu zapisywana jest migawka, jak w Graph
+    def read_snap_file(self, filename):
+        try:
+            sources, targets = self.parse_snap_edges(filename)
+        except FileNotFoundError:
+            print(f"Plik {filename} nie został znaleziony.")
+            return
+        journal, self.journal = self.journal, None
+        try:
+            self.add_edges(sources, targets)
+        finally:
+            self.journal = journal
+        self._journal_snapshot()
+
+    def read_snap_file_bulk(self, filename, chunk_size=None, report=True):
+        stats = super().read_snap_file_bulk(filename, chunk_size, report)
+        self._lists_to_sets()
+        return stats
+
+    def _lists_to_sets(self):
+        self.adjacency_list = {vertex: set(neighbors) for vertex, neighbors in self.adjacency_list.items()}
+
+# Dziennik zmian grafu dopisywany obok migawki (plik <migawka>.journal) - mała zmiana to jeden rekord na końcu
+# pliku zamiast przepisania całej listy krawędzi. Rekord: rodzaj zmiany (uint8) i dwa wierzchołki (int64), LE.
+# Każda zmiana ustawia elementy grafu na stałą wartość (krawędź lub wierzchołek jest albo go nie ma), więc ponowne
+# odtworzenie dziennika na grafie, który już go zawiera, niczego nie zmienia - na tym opiera się składanie
+# dziennika w tle: dziennik jest przemianowany na <migawka>.journal.old, nowe zmiany trafiają do nowego dziennika,
+# a wątek zapisuje migawkę grafu do pliku tymczasowego, podmienia nią starą i dopiero wtedy usuwa stary dziennik.
+# Migawka musi być binarnym plikiem .gcsr (CSR) - SNAP nie przechowuje wierzchołków izolowanych
+class GraphJournal:
+    MAGIC = b"GRAFLOG\0"
+    VERSION = 1
+    HEADER = struct.Struct("<8sII")
+    RECORD = struct.Struct("<Bqq")
+    RECORD_DTYPE = np.dtype([("kind", "u1"), ("vertex1", "<i8"), ("vertex2", "<i8")])
+    ADD_EDGE, REMOVE_EDGE, ADD_VERTEX, REMOVE_VERTEX = 1, 2, 3, 4
+    SUFFIX = ".journal"
+    COMPACTING_SUFFIX = ".journal.old"
+    # Po tylu rekordach od ostatniego składania dziennik składany jest automatycznie w tle
+    COMPACT_RECORDS = 1 << 20
+
+    # sync=True - flush() dodatkowo wymusza zapis na dysk (os.fsync)
+    def __init__(self, graph, snapshot_filename, sync=False, compact_records=None):
+        if os.path.splitext(snapshot_filename)[1].lower() != CSRGraph.BINARY_EXTENSION:
+            raise ValueError(f"Migawka dziennika zmian musi mieć rozszerzenie {CSRGraph.BINARY_EXTENSION}, "
+                             f"plik SNAP gubi wierzchołki izolowane: {snapshot_filename}")
+        self.graph = graph
+        self.snapshot_filename = snapshot_filename
+        self.filename = snapshot_filename + self.SUFFIX
+        self.compacting_filename = snapshot_filename + self.COMPACTING_SUFFIX
+        self.sync = sync
+        self.compact_records = self.COMPACT_RECORDS if compact_records is None else compact_records
+        self.records = 0
+        self.file = None
+        self.compaction = None
+        self.compaction_error = None
+
+    # Graf z migawki i dzienników, z dołączonym dziennikiem zapisującym kolejne zmiany. graph to pusty graf
+    # docelowy (np. SetGraph), domyślnie Graph. Dziennik pozostały po przerwanym składaniu jest składany od nowa
+    @classmethod
+    def open_graph(cls, snapshot_filename, graph=None, sync=False, compact_records=None):
+        graph = Graph() if graph is None else graph
+        journal = cls(graph, snapshot_filename, sync, compact_records)
+        journal.load_snapshot()
+        interrupted = os.path.exists(journal.compacting_filename)
+        if interrupted:
+            journal.replay(journal.compacting_filename)
+        valid_size = journal.replay(journal.filename) if os.path.exists(journal.filename) else 0
+        journal._open(valid_size)
+        graph.journal = journal
+        if interrupted:
+            journal.compact()
+        return graph
+
+    # Dołączenie nowego dziennika do istniejącego grafu - migawka zapisywana od razu, stare dzienniki usuwane
+    @classmethod
+    def attach(cls, graph, snapshot_filename, sync=False, compact_records=None):
+        journal = cls(graph, snapshot_filename, sync, compact_records)
+        for filename in (journal.filename, journal.compacting_filename):
+            if os.path.exists(filename):
+                os.remove(filename)
+        journal._write_snapshot(journal.snapshot_of(graph))
+        journal._open(0)
+        graph.journal = journal
+        return graph
+
+    def load_snapshot(self):
+        if not os.path.exists(self.snapshot_filename):
+            return False
+        journal, self.graph.journal = self.graph.journal, None
+        try:
+            csr = CSRGraph.read_binary_file(self.snapshot_filename, mmap=False)
+            rows = np.repeat(np.arange(len(csr.vertex_ids)), csr.degree_array())
+            self.graph.matrix_to_list((rows, csr.neighbors), csr.vertex_ids)
+        finally:
+            self.graph.journal = journal
+        return True
+
+    # Odtworzenie rekordów dziennika na grafie, bez zapisywania ich ponownie. Niepełny ostatni rekord
+    # (przerwany zapis) jest pomijany; zwraca rozmiar poprawnej części pliku
+    def replay(self, filename):
+        data = np.fromfile(filename, dtype=np.uint8)
+        header_size = self.HEADER.size
+        if len(data) < header_size:
+            return 0
+        magic, version, _ = self.HEADER.unpack(data[:header_size].tobytes())
+        if magic != self.MAGIC:
+            raise ValueError(f"Plik {filename} nie jest dziennikiem zmian grafu.")
+        if version != self.VERSION:
+            raise ValueError(f"Nieobsługiwana wersja dziennika zmian: {version}.")
+        end = header_size + (len(data) - header_size) // self.RECORD.size * self.RECORD.size
+        records = data[header_size:end].view(self.RECORD_DTYPE)
+        journal, self.graph.journal = self.graph.journal, None
+        try:
+            self.apply(self.graph, records)
+        finally:
+            self.graph.journal = journal
+        return end
+
+    @classmethod
+    def apply(cls, graph, records):
+        for kind, vertex1, vertex2 in zip(records["kind"].tolist(), records["vertex1"].tolist(),
+                                          records["vertex2"].tolist()):
+            if kind == cls.ADD_EDGE:
+                if not graph.has_edge(vertex1, vertex2):
+                    graph._insert_edge(vertex1, vertex2)
+            elif kind == cls.REMOVE_EDGE:
+                graph.remove_edge(vertex1, vertex2)
+            elif kind == cls.ADD_VERTEX:
+                if vertex1 not in graph.adjacency_list:
+                    graph.add_vertex(vertex1)
+            elif kind == cls.REMOVE_VERTEX:
+                graph.remove_vertex(vertex1)
+            else:
+                raise ValueError(f"Nieznany rodzaj rekordu dziennika zmian: {kind}.")
+
+    # Otwarcie dziennika do dopisywania - plik obcinany do poprawnej części (valid_size), pusty dostaje nagłówek
+    def _open(self, valid_size):
+        if valid_size:
+            self.file = open(self.filename, "r+b")
+            self.file.truncate(valid_size)
+            self.file.seek(valid_size)
+        else:
+            self.file = open(self.filename, "wb")
+            self.file.write(self.HEADER.pack(self.MAGIC, self.VERSION, 0))
+
+    # Graf zapisuje rekord dopiero po wykonaniu zmiany, więc migawka z automatycznego składania zawiera
+    # wszystkie zmiany z dziennika, a rekord bieżącej zmiany trafia już do nowego dziennika
+    def record(self, kind, vertex1, vertex2=0):
+        if (self.compact_records and self.records >= self.compact_records
+                and (self.compaction is None or not self.compaction.is_alive())):
+            self.compact()
+        self.file.write(self.RECORD.pack(kind, vertex1, vertex2))
+        self.records += 1
+
+    # Zapis buforowanych rekordów do pliku - odpowiednik zapisu grafu po zmianach
+    def flush(self):
+        self.file.flush()
+        if self.sync:
+            os.fsync(self.file.fileno())
+
+    # Złożenie dziennika do nowej migawki. Stan grafu utrwalany jest od razu jako niemodyfikowalny CSR,
+    # więc graf można dalej zmieniać, a przy background=True migawka zapisywana jest w osobnym wątku
+    def compact(self, background=True):
+        self.wait()
+        csr = self.snapshot_of(self.graph)
+        self.file.close()
+        if os.path.exists(self.compacting_filename):
+            with open(self.filename, "rb") as source, open(self.compacting_filename, "ab") as target:
+                source.seek(self.HEADER.size)
+                target.write(source.read())
+            os.remove(self.filename)
+        else:
+            os.replace(self.filename, self.compacting_filename)
+        self._open(0)
+        self.records = 0
+        if background:
+            self.compaction = threading.Thread(target=self._finish_compaction, args=(csr,))
+            self.compaction.start()
+        else:
+            self._finish_compaction(csr)
+            self.wait()
+
+    # Graf jako CSR do zapisania w migawce. Przed podmianą migawki sprawdzane jest, że po ponownym otwarciu
+    # graf będzie taki sam - te same wierzchołki (także izolowane) i stopnie (z pętlami własnymi)
+    @staticmethod
+    def snapshot_of(graph):
+        csr = graph.to_csr()
+        if dict(zip(csr.vertex_ids.tolist(), csr.vertex_degrees().tolist())) != graph.degrees:
+            raise ValueError("Migawka CSR nie odtwarza grafu - dziennik zmian nie został złożony.")
+        return csr
+
+    def _finish_compaction(self, csr):
+        try:
+            self._write_snapshot(csr)
+            os.remove(self.compacting_filename)
+        except Exception as error:
+            self.compaction_error = error
+
+    # Migawka zapisywana do pliku tymczasowego i podmieniana jednym os.replace, więc plik migawki jest zawsze cały
+    def _write_snapshot(self, csr):
+        temporary = self.snapshot_filename + ".tmp"
+        csr.write_binary_file(temporary, report=False)
+        with open(temporary, "rb+") as file:
+            os.fsync(file.fileno())
+        os.replace(temporary, self.snapshot_filename)
+
+    # Oczekiwanie na składanie w tle; błąd z wątku zgłaszany jest tutaj
+    def wait(self):
+        if self.compaction is not None:
+            self.compaction.join()
+            self.compaction = None
+        if self.compaction_error is not None:
+            error, self.compaction_error = self.compaction_error, None
+            raise error
+
+    def close(self):
+        try:
+            self.wait()
+        finally:
+            self.file.close()
+            self.graph.journal = None
+
+# Licznik wystąpień identyfikatorów wierzchołków - identyfikatory z zakresu [0, dense_limit) liczone w tablicy
+# przez np.bincount, pozostałe w słowniku
+class EndpointCounter:
+    def __init__(self, dense_limit):
+        self.dense_limit = dense_limit
+        self.dense = np.zeros(0, dtype=np.int64)
+        self.sparse = {}
+
+    def add(self, endpoints):
+        in_dense = (endpoints >= 0) & (endpoints < self.dense_limit)
+        dense_endpoints = endpoints[in_dense]
+        if len(dense_endpoints):
+            counts = np.bincount(dense_endpoints)
+            if len(counts) > len(self.dense):
+                grown = np.zeros(min(max(len(counts), 2 * len(self.dense)), self.dense_limit), dtype=np.int64)
+                grown[:len(self.dense)] = self.dense
+                self.dense = grown
+            self.dense[:len(counts)] += counts
+        sparse_endpoints = np.sort(endpoints[~in_dense])
+        if len(sparse_endpoints):
+            starts = np.flatnonzero(np.concatenate(([True], sparse_endpoints[1:] != sparse_endpoints[:-1])))
+            counts = np.diff(np.append(starts, len(sparse_endpoints)))
+            for vertex, count in zip(sparse_endpoints[starts].tolist(), counts.tolist()):
+                self.sparse[vertex] = self.sparse.get(vertex, 0) + count
+
+    # Posortowane identyfikatory i liczby ich wystąpień
+    def counts(self):
+        vertex_ids = np.flatnonzero(self.dense)
+        counts = self.dense[vertex_ids]
+        if self.sparse:
+            vertex_ids = np.concatenate((vertex_ids, np.fromiter(self.sparse.keys(), dtype=np.int64)))
+            counts = np.concatenate((counts, np.fromiter(self.sparse.values(), dtype=np.int64)))
+            order = np.argsort(vertex_ids)
+            vertex_ids, counts = vertex_ids[order], counts[order]
+        return vertex_ids, counts
+
+# Strumieniowe liczenie stopni - plik SNAP czytany blokami, w pamięci zostają tylko liczniki wierzchołków
+# jako źródeł i jako celów. Powtórzeń krawędzi nie da się wykryć bez pamiętania krawędzi, więc o sposobie
+# liczenia decyduje symmetric: True - każda krawędź występuje w pliku w obu kierunkach (jak w plikach
+# z write_snap_file), False - każda linia to osobna krawędź, None - rozpoznanie po licznikach: plik jest
+# symetryczny, gdy każdy wierzchołek jest tyle samo razy źródłem co celem. Przy symmetric=True plik, który
+# tego warunku nie spełnia, zgłasza ValueError, a przy None wypisywane jest ostrzeżenie, bo krawędzie zapisane
+# w obu kierunkach liczą się wtedy podwójnie. Pętle własne są pomijane
+class DegreeCounter:
+    # Identyfikatory z zakresu [0, DENSE_LIMIT) liczone w tablicy przez np.bincount, pozostałe w słowniku
+    DENSE_LIMIT = 1 << 26
+
+    def __init__(self, symmetric=None):
+        self.symmetric = symmetric
+        self.sources = EndpointCounter(self.DENSE_LIMIT)
+        self.targets = EndpointCounter(self.DENSE_LIMIT)
+        self.arc_count = 0
+        self.annih_number = 0
+        self.poten = 0
+        self._degrees = None
+
+    @classmethod
+    def from_snap_file(cls, filename, chunk_size=None, symmetric=None, report=True):
+        counter = cls(symmetric)
+        with LoadStats(f"Policzono stopnie {filename}") as stats:
+            for sources, targets in Graph.iter_snap_chunks(filename, chunk_size):
+                counter.add_edges(sources, targets)
+            stats.edges = counter.num_edges
+        if report:
+            stats.report()
+        counter.load_stats = stats
+        return counter
+
+    def add_edges(self, sources, targets):
+        keep = sources != targets
+        self.sources.add(sources[keep])
+        self.targets.add(targets[keep])
+        self.arc_count += int(np.count_nonzero(keep))
+        self._degrees = None
+
+    # Czy linie pliku liczone są jako krawędzie zapisane w obu kierunkach
+    def is_symmetric(self):
+        return self._resolve()[0]
+
+    @property
+    def num_edges(self):
+        return self.arc_count // 2 if self.is_symmetric() else self.arc_count
+
+    # Sposób liczenia i stopnie wyznaczane raz po wczytaniu, ponownie dopiero po dodaniu krawędzi
+    def _resolve(self):
+        if self._degrees is None:
+            out_ids, out_counts = self.sources.counts()
+            in_ids, in_counts = self.targets.counts()
+            balanced = np.array_equal(out_ids, in_ids) and np.array_equal(out_counts, in_counts)
+            if self.symmetric and not balanced:
+                raise ValueError("Krawędzie nie występują w obu kierunkach - stopnie przy symmetric=True "
+                                 "byłyby błędne, użyj symmetric=False.")
+            if self.symmetric is None and not balanced:
+                print("Uwaga: plik nie jest symetryczny, każda linia liczona jest jako osobna krawędź - "
+                      "krawędzie zapisane w obu kierunkach zawyżają stopnie. Podaj symmetric=False, "
+                      "jeśli każda krawędź występuje w pliku raz.")
+            symmetric = balanced if self.symmetric is None else self.symmetric
+            if symmetric:
+                vertex_ids, degrees = out_ids, out_counts
+            else:
+                vertex_ids, inverse = np.unique(np.concatenate((out_ids, in_ids)), return_inverse=True)
+                degrees = np.bincount(inverse, weights=np.concatenate((out_counts, in_counts)),
+                                      minlength=len(vertex_ids)).astype(np.int64)
+            self._degrees = (symmetric, vertex_ids, degrees)
+        return self._degrees
+
+    # Posortowane identyfikatory wierzchołków i ich stopnie
+    def vertex_degrees(self):
+        return self._resolve()[1:]
+
+    # Ciąg stopni w porządku nierosnącym
+    def degree_sequence(self):
+        return np.sort(self.vertex_degrees()[1])[::-1]
+
+    def calculate_degrees(self):
+        vertex_ids, degrees = self.vertex_degrees()
+        return dict(zip(vertex_ids.tolist(), degrees.tolist()))
+
+    def annihilation_number(self):
+        result, last_prefix = Graph.annihilation_from_degrees(self.vertex_degrees()[1])
+        if last_prefix is not None:
+            self.annih_number = last_prefix
+        return result
+
+    def find_potential(self):
+        return self.calculate_degrees()
+
+    def graph_potential(self):
+        self.poten = int(self.vertex_degrees()[1].max())
+        return self.poten
+
+# Pula procesów roboczych - "fork" tam, gdzie jest dostępny, więc stan nie jest kopiowany przez pickle.
+# state trafia do każdego procesu raz, przez inicjalizator puli, a zadania niosą tylko swoje argumenty:
+# proces wykonuje function(state, zadanie). Zadania zleca się przez pool.imap_unordered(_worker_task, zadania)
+def worker_pool(processes, function, state):
+    start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    return multiprocessing.get_context(start_method).Pool(processes, initializer=_worker_init,
+                                                          initargs=(function, state))
+
+# Funkcja zadań i stan procesu roboczego puli z worker_pool, ustawiane raz przez inicjalizator
+_worker_function = None
+_worker_state = None
+
+def _worker_init(function, state):
+    global _worker_function, _worker_state
+    _worker_function, _worker_state = function, state
+
+def _worker_task(task):
+    return _worker_function(_worker_state, task)
+
+# Generatory syntetycznych danych do testów wydajności - krawędzie zwracane jako dwie tablice bez pętli i powtórzeń
+class GraphGenerators:
+    # Graf losowy Erdősa–Rényiego G(n, m) o zadanym średnim stopniu
+    @staticmethod
+    def erdos_renyi(vertex_count, average_degree=8, seed=0):
+        rng = np.random.default_rng(seed)
+        edge_count = vertex_count * average_degree // 2
+        sources = rng.integers(0, vertex_count, edge_count * 11 // 10 + 16)
+        targets = rng.integers(0, vertex_count, len(sources))
+        return GraphGenerators._simple_edges(sources, targets, edge_count)
+
+    # Graf o potęgowym rozkładzie stopni (model Chunga–Lu) - końce krawędzi losowane z wagami i^(-1/(wykładnik-1))
+    @staticmethod
+    def power_law(vertex_count, average_degree=8, exponent=2.5, seed=0):
+        rng = np.random.default_rng(seed)
+        edge_count = vertex_count * average_degree // 2
+        weights = np.arange(1, vertex_count + 1, dtype=np.float64) ** (-1.0 / (exponent - 1))
+        weights /= weights.sum()
+        sources = rng.choice(vertex_count, edge_count * 3 // 2 + 16, p=weights)
+        targets = rng.choice(vertex_count, len(sources), p=weights)
+        return GraphGenerators._simple_edges(sources, targets, edge_count)
+
+    # Losowe pole kół o promieniach z [1/3, 1] i stałej średniej liczbie sąsiadów niezależnie od liczby kół.
+    # Średnia suma promieni pary to 4/3, więc bok kwadratu dobierany jest z n * pi * (4/3)^2 / bok^2 = sąsiedzi
+    @staticmethod
+    def circle_field(count, average_neighbors=4, seed=0):
+        rng = np.random.default_rng(seed)
+        side = math.sqrt(count * math.pi * (4 / 3) ** 2 / average_neighbors)
+        x = rng.uniform(0, side, count)
+        y = rng.uniform(0, side, count)
+        radius = rng.uniform(1 / 3, 1, count)
+        return CircleStore(x, y, radius)
+
+    @staticmethod
+    def _simple_edges(sources, targets, edge_count):
+        low = np.minimum(sources, targets)
+        high = np.maximum(sources, targets)
+        keep = low != high
+        keys = low[keep] * (int(high.max(initial=0)) + 1) + high[keep]
+        first = GraphGenerators._first_occurrences(keys)
+        order = np.sort(first)[:edge_count]
+        return low[keep][order], high[keep][order]
+
+    # Indeksy pierwszych wystąpień każdego klucza, przez sortowanie stabilne (szybsze od np.unique)
+    @staticmethod
+    def _first_occurrences(keys):
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        first = np.ones(len(keys), dtype=bool)
+        np.not_equal(sorted_keys[1:], sorted_keys[:-1], out=first[1:])
+        return order[first]
+
+# Zestaw testów wydajności - każda operacja mierzona perf_counter po rozgrzewce, w kilku powtórzeniach,
+# dla grafów i pól kół rosnącej wielkości. Wyniki zapisywane do JSON i porównywane z poprzednim przebiegiem
+class BenchmarkSuite:
+    GRAPH_GENERATORS = {"erdos_renyi": GraphGenerators.erdos_renyi, "power_law": GraphGenerators.power_law}
+    GRAPH_OPERATIONS = ("load", "degrees", "annihilation", "potential", "paths")
+    CIRCLE_ENGINES = ("grid", "numpy")
+
+    def __init__(self, sizes=(1000, 10000, 100000), circle_sizes=(1000, 10000, 100000),
+                 repeats=5, warmup=1, path_length=3, seed=0):
+        self.sizes = sizes
+        self.circle_sizes = circle_sizes
+        self.repeats = repeats
+        self.warmup = warmup
+        self.path_length = path_length
+        self.seed = seed
+        self.results = []
+
+    # Rozgrzewka i powtórzenia jednej operacji; setup przygotowuje świeże dane poza pomiarem czasu
+    def measure(self, operation, generator, size, function, setup=None):
+        for _ in range(self.warmup):
+            function(setup() if setup else None)
+        timings = []
+        for _ in range(self.repeats):
+            argument = setup() if setup else None
+            start = perf_counter()
+            function(argument)
+            timings.append(perf_counter() - start)
+        result = {"operation": operation, "generator": generator, "size": size, "repeats": self.repeats,
+                  "min": min(timings), "median": median(timings), "mean": mean(timings), "stdev": pstdev(timings)}
+        self.results.append(result)
+        print(f"{operation:>24} {generator:>12} {size:>9}: mediana {result['median']:.6f} s, min {result['min']:.6f} s")
+        return result
+
+    def run(self):
+        self.results = []
+        with tempfile.TemporaryDirectory() as directory:
+            for generator_name, generator in self.GRAPH_GENERATORS.items():
+                for size in self.sizes:
+                    self._run_graph(generator_name, generator, size, directory)
+        for size in self.circle_sizes:
+            circles = GraphGenerators.circle_field(size, seed=self.seed)
+            for engine in self.CIRCLE_ENGINES:
+                self.measure(f"circle_adjacency_{engine}", "circle_field", size,
+                             lambda _, engine=engine: CircleGraph(circles, engine))
+        return self.results
+
+    def _run_graph(self, generator_name, generator, size, directory):
+        sources, targets = generator(size, seed=self.seed)
+        filename = os.path.join(directory, f"{generator_name}_{size}.snap")
+        np.savetxt(filename, np.column_stack((sources, targets)), fmt="%d", delimiter="\t")
+        graph = Graph()
+        graph.read_snap_file_bulk(filename, report=False)
+        operations = {
+            "load": lambda _: Graph().read_snap_file_bulk(filename, report=False),
+            "degrees": lambda _: graph.calculate_degrees(),
+            "annihilation": lambda _: graph.annihilation_number(),
+            "potential": lambda _: graph.graph_potential(),
+            "paths": lambda _: graph.count_paths(self.path_length),
+        }
+        # Pamięć wyników grafu czyszczona przed każdym powtórzeniem - mierzone są obliczenia, a nie odczyt z pamięci
+        for operation in self.GRAPH_OPERATIONS:
+            self.measure(operation, generator_name, size, operations[operation], graph.memo.clear)
+
+    def save_json(self, filename):
+        report = {"created": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                  "numpy": np.__version__, "machine": platform.platform(), "repeats": self.repeats,
+                  "warmup": self.warmup, "results": self.results}
+        with open(filename, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Wyniki testów zapisane do pliku o nazwie {filename}\n")
+
+    # Porównanie median z poprzednim zapisem - zwraca operacje wolniejsze o więcej niż threshold (0.2 = 20%)
+    def compare_json(self, baseline_filename, threshold=0.2):
+        with open(baseline_filename, "r") as file:
+            baseline = {(result["operation"], result["generator"], result["size"]): result
+                        for result in json.load(file)["results"]}
+        regressions = []
+        for result in self.results:
+            previous = baseline.get((result["operation"], result["generator"], result["size"]))
+            if previous is None or previous["median"] <= 0:
+                continue
+            ratio = result["median"] / previous["median"]
+            if ratio > 1 + threshold:
+                regressions.append({**result, "baseline_median": previous["median"], "ratio": ratio})
+                print(f"Regresja: {result['operation']} {result['generator']} {result['size']}: "
+                      f"{previous['median']:.6f} s -> {result['median']:.6f} s ({ratio:.2f}x)")
+        if not regressions:
+            print("Brak regresji względem poprzedniego przebiegu.")
+        return regressions
+
+# Wsadowe liczenie metryk dla wielu plików bez interfejsu - pliki przetwarzane równolegle w puli procesów,
+# a dla każdego pliku od razu wypisywany jeden rekord JSON (JSONL), w kolejności ukończenia
+class BatchRunner:
+    METRICS = ("vertices", "edges", "degrees", "annihilation", "potential", "paths", "triangles", "clustering",
+               "transitivity", "components")
+    CIRCLE_EXTENSIONS = (".circles", CircleStore.BINARY_EXTENSION)
+    # Pliki .txt bywają listami krawędzi SNAP (2 kolumny) albo plikami kół (4 kolumny: Id X Y Rad)
+    TEXT_EXTENSIONS = (".txt",)
+
+    def __init__(self, metrics=METRICS, path_length=3, engine="grid"):
+        unknown = [metric for metric in metrics if metric not in self.METRICS]
+        if unknown:
+            raise ValueError(f"Nieznane metryki {', '.join(unknown)}, dostępne: {', '.join(self.METRICS)}")
+        self.metrics = tuple(metrics)
+        self.path_length = path_length
+        self.engine = engine
+
+    # Wzorce glob rozwijane w posortowaną listę plików; wzorzec bez dopasowań zostaje, żeby trafił do wyników jako błąd
+    @staticmethod
+    def expand_files(patterns):
+        files = []
+        for pattern in patterns:
+            files.extend(sorted(glob.glob(pattern)) or [pattern])
+        return files
+
+    # Pliki kół (.txt, .circles, .gcir) zamieniane na CSR po kluczach kół, binarne .gcsr mapowane z dysku, reszta to SNAP
+    def load(self, filename):
+        extension = os.path.splitext(filename)[1].lower()
+        if extension == CSRGraph.BINARY_EXTENSION:
+            return "csr", CSRGraph.read_binary_file(filename)
+        if extension in self.CIRCLE_EXTENSIONS or (extension in self.TEXT_EXTENSIONS
+                                                   and self.text_kind(filename) == "circles"):
+            return "circles", CSRGraph.from_adjacency_list(CircleGraph.read_from_file(filename, self.engine).adjacency)
+        return "snap", CSRGraph.from_snap_edges(*Graph.parse_snap_edges(filename))
+
+    # Rodzaj pliku tekstowego po liczbie kolumn pierwszego wiersza danych: 4 - koła, każda inna - SNAP
+    @staticmethod
+    def text_kind(filename):
+        with open(filename, "rb") as file:
+            for line in file:
+                parts = line.split()
+                if parts and not parts[0].startswith(b"#"):
+                    return "circles" if len(parts) == 4 else "snap"
+        return "snap"
+
+    def process(self, filename):
+        start = perf_counter()
+        try:
+            kind, graph = self.load(filename)
+            record = {"file": filename, "kind": kind, "load_seconds": perf_counter() - start}
+            for metric in self.metrics:
+                if metric == "vertices":
+                    record["vertices"] = len(graph.vertex_ids)
+                elif metric == "edges":
+                    record["edges"] = graph.num_edges
+                elif metric == "degrees":
+                    record["degrees"] = {str(degree): count for degree, count
+                                         in sorted(graph.degree_histogram.counts.items())}
+                elif metric == "annihilation":
+                    record["annihilation"] = graph.annihilation_number()
+                elif metric == "potential":
+                    record["potential"] = graph.graph_potential()
+                elif metric == "paths":
+                    record["paths"] = graph.count_paths(self.path_length)
+                elif metric == "triangles":
+                    record["triangles"] = graph.count_triangles()
+                elif metric == "clustering":
+                    record["clustering"] = graph.average_clustering()
+                elif metric == "transitivity":
+                    record["transitivity"] = graph.transitivity()
+                elif metric == "components":
+                    components = graph.connected_components()
+                    record["components"] = len(components)
+                    record["largest_component"] = len(components[0]) if components else 0
+        except Exception as error:
+            record = {"file": filename, "error": f"{type(error).__name__}: {error}"}
+        record["seconds"] = perf_counter() - start
+        return record
+
+    # Zwraca liczbę plików zakończonych błędem; output to otwarty plik tekstowy (domyślnie stdout)
+    def run(self, files, processes=None, output=None):
+        output = output or sys.stdout
+        processes = min(processes or os.cpu_count() or 1, max(len(files), 1))
+        errors = 0
+        if processes == 1:
+            records = map(self.process, files)
+            pool = None
+        else:
+            pool = worker_pool(processes, BatchRunner.process, self)
+            records = pool.imap_unordered(_worker_task, files)
+        try:
+            for record in records:
+                errors += "error" in record
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        return errors
+
+# Statystyki wywołań jednej metody - liczba wywołań, czasy, histogram czasów i pamięć zaalokowana w trakcie
+class MethodStats:
+    def __init__(self, name):
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.min_seconds = float("inf")
+        self.max_seconds = 0.0
+        # Kubełek b zlicza wywołania trwające od 2^(b-1) do 2^b mikrosekund
+        self.histogram = {}
+        self.allocated_bytes = 0
+        self.max_allocated_bytes = 0
+
+    def record(self, seconds, allocated_bytes=None):
+        self.calls += 1
+        self.total_seconds += seconds
+        self.min_seconds = min(self.min_seconds, seconds)
+        self.max_seconds = max(self.max_seconds, seconds)
+        bucket = int(seconds * 1e6).bit_length()
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+        if allocated_bytes is not None:
+            self.allocated_bytes += allocated_bytes
+            self.max_allocated_bytes = max(self.max_allocated_bytes, allocated_bytes)
+
+    def to_dict(self):
+        return {"name": self.name, "calls": self.calls, "total_seconds": self.total_seconds,
+                "mean_seconds": self.total_seconds / self.calls if self.calls else 0.0,
+                "min_seconds": self.min_seconds if self.calls else 0.0, "max_seconds": self.max_seconds,
+                "histogram_us": {f"<{2 ** bucket}": count for bucket, count in sorted(self.histogram.items())},
+                "allocated_bytes": self.allocated_bytes, "max_allocated_bytes": self.max_allocated_bytes}
+
+# Pomiary wywołań metod publicznych zarejestrowanych klas. Wyłączone nic nie kosztują - metody są podmieniane
+# na opakowania mierzące dopiero w enable() i przywracane w disable(). Pamięć mierzona przez tracemalloc
+# jako szczyt zaalokowanych bajtów w czasie wywołania, opcjonalnie cały przebieg nagrywany przez cProfile.
+# Dla generatorów mierzone jest tylko utworzenie generatora
+class Instrumentation:
     def __init__(self):
-        self.TimeAdjListDefault = 0
-        self.TimeDegDefault = 0
-        self.TimeAddVertexDefault = 0
-        self.TimeAnnihilationDefault = 0
-        self.TimePotentialDefault = 0
-        self.TimeAdjListFile = 0
-        self.TimeDegFile = 0
-        self.TimeAddVertFile = 0
-        self.TimeAnnihilationFile = 0
-        self.TimePotentialFile = 0
-
-    def set_TimeAdjListDefault(self, time):
-        self.TimeAdjListDefault = time
-    def set_TimeDegDefault(self, time):
-        self.TimeDegDefault = time
-    def set_TimeAddVertexDefault(self, time):
-        self.TimeAddVertexDefault = time
-    def set_TimeAnnihilationDefault(self, time):
-        self.TimeAnnihilationDefault = time
-    def set_TimePotentialDefault(self, time):
-        self.TimePotentialDefault = time
-    def set_TimeAdjListFile(self, time):
-        self.TimeAdjListFile = time
-    def set_TimeAddVertFile(self, time):
-        self.TimeAddVertFile = time
-    def set_TimeDegFile(self, time):
-        self.TimeDegFile = time
-    def set_TimeAnnihilationFile(self, time):
-        self.TimeAnnihilationFile = time
-    def set_TimePotentialFile(self, time):
-        self.TimePotentialFile = time
-    
+        self.classes = []
+        self.stats = {}
+        self.enabled = False
+        self.track_memory = False
+        self.profiler = None
+        self._originals = []
+        self._memory_stack = []
+        self._started_tracemalloc = False
 
+    def register(self, cls):
+        self.classes.append(cls)
+        if self.enabled:
+            self._patch(cls)
+        return cls
 
-# Przykładowa macierz:
-matrix = [
-    [0, 1, 1, 1, 1, 1],
-    [1, 0, 1, 1, 0, 0],
-    [1, 1, 0, 1, 1, 0],
-    [1, 1, 1, 0, 1, 1],
-    [1, 0, 1, 1, 0, 1],
-    [1, 0, 0, 1, 1, 0],
-]
+    def enable(self, track_memory=False, profile=False):
+        if self.enabled:
+            self.disable()
+        self.track_memory = track_memory
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        for cls in self.classes:
+            self._patch(cls)
+        self.enabled = True
 
-# Utworzenie obiektu grafu
-timeStats = Statistics()
-graph = Graph()
-timer_start_adjList_default = time()
-graph.matrix_to_list(matrix)
-timer_end_adjList_default = time()
+    def disable(self):
+        for cls, name, original in reversed(self._originals):
+            setattr(cls, name, original)
+        self._originals = []
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self.enabled = False
 
-timeStats.set_TimeAdjListDefault(timer_end_adjList_default - timer_start_adjList_default)
+    # Zerowanie w miejscu - zainstalowane wrappery trzymają te same obiekty MethodStats
+    def reset(self):
+        for stats in self.stats.values():
+            stats.reset()
 
-timer_start_deg_default = time()
-graph.calculate_degrees(graph.adjacency_list)
-timer_end_deg_default = time()
+    def _patch(self, cls):
+        for name, attribute in list(vars(cls).items()):
+            if name.startswith("_"):
+                continue
+            if isinstance(attribute, (staticmethod, classmethod)):
+                wrapped = type(attribute)(self._wrap(f"{cls.__name__}.{name}", attribute.__func__))
+            elif inspect.isfunction(attribute):
+                wrapped = self._wrap(f"{cls.__name__}.{name}", attribute)
+            else:
+                continue
+            self._originals.append((cls, name, attribute))
+            setattr(cls, name, wrapped)
 
-timeStats.set_TimeDegDefault(timer_end_deg_default - timer_start_deg_default)
+    def _wrap(self, name, function):
+        stats = self.stats.setdefault(name, MethodStats(name))
 
-timer_start_anihilation_default = time()
-graph.annihilation_number(graph.adjacency_list)
-timer_end_anihilation_default = time()
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            self._begin_memory()
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stats.record(perf_counter() - start, self._end_memory())
+        return wrapper
 
-timeStats.set_TimeAnnihilationDefault(timer_end_anihilation_default - timer_start_anihilation_default)
+    # Szczyt pamięci wywołań zagnieżdżonych przenoszony do wywołania zewnętrznego, bo reset_peak jest globalny.
+    # Z tego samego powodu pamięć mierzona jest tylko w głównym wątku - wywołania z wątków w tle mają tylko
+    # czasy i nie zerują szczytu wywołaniu mierzonemu w głównym wątku
+    def _tracks_memory(self):
+        return self.track_memory and threading.current_thread() is threading.main_thread()
 
-timer_start_potential_default = time()
-graph.graph_potential()
-timer_end_potential_default = time()
+    def _begin_memory(self):
+        if not self._tracks_memory():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if self._memory_stack:
+            self._memory_stack[-1][1] = max(self._memory_stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        self._memory_stack.append([current, current])
 
-timeStats.set_TimePotentialDefault(timer_end_potential_default - timer_start_potential_default)
+    def _end_memory(self):
+        if not self._tracks_memory() or not self._memory_stack:
+            return None
+        peak = tracemalloc.get_traced_memory()[1]
+        start, running_peak = self._memory_stack.pop()
+        running_peak = max(running_peak, peak)
+        if self._memory_stack:
+            self._memory_stack[-1][1] = max(self._memory_stack[-1][1], running_peak)
+        return running_peak - start
 
-graphFile = Graph()
-timer_start_adjList_File = time()
-graphFile.read_snap_file("graph.snap")
-timer_end_adjList_File = time()
+    def report(self):
+        measured = sorted((stats for stats in self.stats.values() if stats.calls),
+                          key=lambda stats: stats.total_seconds, reverse=True)
+        if not measured:
+            print("Brak pomiarów.")
+            return
+        print(f"{'Metoda':<36} {'Wywołania':>9} {'Łącznie [s]':>12} {'Średnio [s]':>12} {'Maks. [s]':>12} {'Pamięć [B]':>12}")
+        for stats in measured:
+            print(f"{stats.name:<36} {stats.calls:>9} {stats.total_seconds:>12.6f} "
+                  f"{stats.total_seconds / stats.calls:>12.6f} {stats.max_seconds:>12.6f} {stats.max_allocated_bytes:>12}")
 
-timeStats.set_TimeAdjListFile(timer_end_adjList_File - timer_start_adjList_File)
+    def export_json(self, filename):
+        with open(filename, "w") as file:
+            json.dump([stats.to_dict() for stats in self.stats.values() if stats.calls], file, indent=2)
+        print(f"Pomiary zapisane do pliku o nazwie {filename}\n")
 
-timer_start_deg_File = time()
-graphFile.calculate_degrees(graphFile.adjacency_list)
-timer_end_deg_File = time()
+    def dump_profile(self, filename):
+        if self.profiler is None:
+            print("Profilowanie nie było włączone.")
+            return
+        self.profiler.dump_stats(filename)
 
-timeStats.set_TimeDegFile(timer_end_deg_File - timer_start_deg_File)
+    def print_profile(self, limit=20):
+        if self.profiler is None:
+            print("Profilowanie nie było włączone.")
+            return
+        import pstats
+        pstats.Stats(self.profiler).sort_stats("cumulative").print_stats(limit)
 
-timer_start_anihilation_File = time()
-graphFile.annihilation_number(graphFile.adjacency_list)
-timer_end_anihilation_File = time()
+instrumentation = Instrumentation()
+for instrumented_class in (CircleGraph, Graph, CSRGraph, SetGraph):
+    instrumentation.register(instrumented_class)
 
-timeStats.set_TimeAnnihilationFile(timer_end_anihilation_File - timer_start_anihilation_File)
+# Czasy operacji wykonanych w programie - nazwa operacji -> lista zmierzonych czasów
+class Statistics:
+    def __init__(self):
+        self.timings = {}
+
+    def record(self, name, seconds):
+        self.timings.setdefault(name, []).append(seconds)
+
+    # Wykonanie funkcji z pomiarem czasu perf_counter, zwraca wynik funkcji
+    def measure(self, name, function, *args, **kwargs):
+        start = perf_counter()
+        result = function(*args, **kwargs)
+        self.record(name, perf_counter() - start)
+        return result
+
+    # Ostatni zmierzony czas operacji albo 0, jeśli jeszcze jej nie mierzono
+    def last(self, name):
+        return self.timings[name][-1] if name in self.timings else 0
+
+
+# Przykładowa macierz:
+matrix = [
+    [0, 1, 1, 1, 1, 1],
+    [1, 0, 1, 1, 0, 0],
+    [1, 1, 0, 1, 1, 0],
+    [1, 1, 1, 0, 1, 1],
+    [1, 0, 1, 1, 0, 1],
+    [1, 0, 0, 1, 1, 0],
+]
+
+timeStats = Statistics()
+graph = None
+graphFile = None
+graphCircle = None
 
-timer_start_potential_File = time()
-graphFile.graph_potential()
-timer_end_potential_File = time()
+# Grafy interfejsu tworzone przy pierwszym użyciu, a nie przy imporcie modułu
+def load_default_graph():
+    global graph
+    if graph is None:
+        graph = Graph()
+        timeStats.measure("adj_list_default", graph.matrix_to_list, matrix)
+        timeStats.measure("degrees_default", graph.calculate_degrees, graph.adjacency_list)
+        timeStats.measure("annihilation_default", graph.annihilation_number, graph.adjacency_list)
+        timeStats.measure("potential_default", graph.graph_potential)
+    return graph
 
-timeStats.set_TimePotentialFile(timer_end_potential_File - timer_start_potential_File)
-graphCircle = CircleGraph.read_from_file("circles.txt")
+def load_file_graph(filename="graph.snap"):
+    global graphFile
+    if graphFile is None:
+        graphFile = Graph()
+        timeStats.measure("adj_list_file", graphFile.read_snap_file, filename)
+        timeStats.measure("degrees_file", graphFile.calculate_degrees, graphFile.adjacency_list)
+        timeStats.measure("annihilation_file", graphFile.annihilation_number, graphFile.adjacency_list)
+        timeStats.measure("potential_file", graphFile.graph_potential)
+    return graphFile
+
+def load_circle_graph(filename="circles.txt"):
+    global graphCircle
+    if graphCircle is None:
+        graphCircle = CircleGraph.read_from_file(filename)
+    return graphCircle
 
 # Funkcje interfejsu użytkownika
 def UI_HighLvL():
@@ -409,9 +3029,37 @@ Dla jakiego grafu chcesz wykonywać czynności?
     UI_LowLvL(int_input_graphType)
     return int_input_graphType
 
+# Pomiary wszystkich operacji na grafach - włączenie (opcjonalnie z profilem cProfile), raport, profil
+# i eksport do plików
+def UI_Instrumentation():
+    if not instrumentation.enabled:
+        print("Pomiary wszystkich operacji na grafach są wyłączone. Włączyć? T/N")
+        input_enable = input()
+        if (input_enable == "T") or (input_enable == "t"):
+            print("Nagrywać także profil cProfile? T/N")
+            input_profile = input()
+            instrumentation.enable(track_memory=True, profile=(input_profile == "T") or (input_profile == "t"))
+        return
+    instrumentation.report()
+    print("Eksportować pomiary do pliku JSON? T/N")
+    input_export = input()
+    if (input_export == "T") or (input_export == "t"):
+        instrumentation.export_json(input("Podaj nazwę pliku: "))
+    if instrumentation.profiler is None:
+        return
+    print("Wypisać profil cProfile? T/N")
+    input_print = input()
+    if (input_print == "T") or (input_print == "t"):
+        instrumentation.print_profile()
+    print("Zapisać profil cProfile do pliku? T/N")
+    input_dump = input()
+    if (input_dump == "T") or (input_dump == "t"):
+        instrumentation.dump_profile(input("Podaj nazwę pliku: "))
+
 def UI_LowLvL(int_input_graphType):
     match(int_input_graphType):
         case 1:
+            graph = load_default_graph()
             print("""
 Wybierz akcję którą chcesz wykonać dla grafu przykładowego:
 Podaj odpowiednią cyfrę:
@@ -442,10 +3090,7 @@ Podaj odpowiednią cyfrę:
                     UI_LowLvL(int_input_graphType)
                 case 4:
                     vertex = int(input("Podaj wierzchołek do dodania: "))
-                    timer_start_addVertex = time()
-                    graph.add_vertex(vertex)
-                    timer_end_addVertex = time()
-                    timeStats.set_TimeAddVertexDefault(timer_end_addVertex - timer_start_addVertex)
+                    timeStats.measure("add_vertex_default", graph.add_vertex, vertex)
                     UI_LowLvL(int_input_graphType)
                 case 5:
                     vertex = int(input("Podaj wierzchołek do usunięcia: "))
@@ -469,17 +3114,17 @@ Podaj odpowiednią cyfrę:
                     UI_LowLvL(int_input_graphType)
                 case 10:
                     target_length = int(input("Podaj długość ścieżki: "))
-                    timer_start_paths_default = time()
-                    graph.all_dfs_paths(target_length)
-                    timer_end_paths_default = time()
-                    print(f"Czas wyliczania stopni wierzchołków z pliku: {timer_end_paths_default - timer_start_paths_default} s")
+                    path_count = timeStats.measure("paths_default", graph.count_paths, target_length)
+                    print(f"Całkowita liczba ścieżek {target_length}: {path_count}")
+                    print(f"Czas wyliczania ścieżek: {timeStats.last('paths_default')} s")
                     UI_LowLvL(int_input_graphType)
                 case 11:
-                    print(f"Czas wyliczenia listy sąsiedztwa dla grafu przykładowego: {timeStats.TimeAdjListDefault} s")
-                    print(f"Czas wyliczania stopni wierzchołków: {timeStats.TimeDegDefault} s")
-                    print(f"Czas dodawania wierzchołka: {timeStats.TimeAddVertexDefault} s")
-                    print(f"Czas wyliczania liczby anihilacji: {timeStats.TimeAnnihilationDefault} s")
-                    print(f"Czas wyliczania potencjałów wierzchołków: {timeStats.TimePotentialDefault} s")
+                    print(f"Czas wyliczenia listy sąsiedztwa dla grafu przykładowego: {timeStats.last('adj_list_default')} s")
+                    print(f"Czas wyliczania stopni wierzchołków: {timeStats.last('degrees_default')} s")
+                    print(f"Czas dodawania wierzchołka: {timeStats.last('add_vertex_default')} s")
+                    print(f"Czas wyliczania liczby anihilacji: {timeStats.last('annihilation_default')} s")
+                    print(f"Czas wyliczania potencjałów wierzchołków: {timeStats.last('potential_default')} s")
+                    UI_Instrumentation()
                     UI_LowLvL(int_input_graphType)
                 case 12:
                     input_file = str(input("Podaj nazwę pliku: "))
@@ -490,6 +3135,7 @@ Podaj odpowiednią cyfrę:
                     print("Zmień graf.")
                     UI_HighLvL()
         case 2:
+            graphFile = load_file_graph()
             print("""
 Wybierz akcję którą chcesz wykonać dla grafu z pliku:
 Podaj odpowiednią cyfrę:
@@ -520,10 +3166,7 @@ Podaj odpowiednią cyfrę:
                     UI_LowLvL(int_input_graphType)
                 case 4:
                     vertex = int(input("Podaj wierzchołek do dodania: "))
-                    timer_start_addVertex = time()
-                    graphFile.add_vertex(vertex)
-                    timer_end_addVertex = time()
-                    timeStats.set_TimeAddVertFile(timer_end_addVertex - timer_start_addVertex)
+                    timeStats.measure("add_vertex_file", graphFile.add_vertex, vertex)
                     UI_LowLvL(int_input_graphType)
                 case 5:
                     vertex = int(input("Podaj wierzchołek do usunięcia: "))
@@ -547,17 +3190,17 @@ Podaj odpowiednią cyfrę:
                     UI_LowLvL(int_input_graphType)
                 case 10:
                     target_length = int(input("Podaj długość ścieżki: "))
-                    timer_start_paths = time()
-                    graphFile.all_dfs_paths(target_length)
-                    timer_end_paths = time()
-                    print(f"Czas wyliczania stopni wierzchołków z pliku: {timer_end_paths - timer_start_paths} s")
+                    path_count = timeStats.measure("paths_file", graphFile.count_paths, target_length)
+                    print(f"Całkowita liczba ścieżek {target_length}: {path_count}")
+                    print(f"Czas wyliczania ścieżek z pliku: {timeStats.last('paths_file')} s")
                     UI_LowLvL(int_input_graphType)
                 case 11:
-                    print(f"Czas wyliczenia listy sąsiedztwa dla grafu przykłądowego: {timeStats.TimeAdjListFile} s")
-                    print(f"Czas wyliczania stopni wierzchołków: {timeStats.TimeDegFile} s")
-                    print(f"Czas dodawania wierzchołka: {timeStats.TimeAddVertFile} s")
-                    print(f"Czas wyliczania liczby anihilacji: {timeStats.TimeAnnihilationFile} s")
-                    print(f"Czas wyliczania potencjałów wierzchołków: {timeStats.TimePotentialFile} s")
+                    print(f"Czas wyliczenia listy sąsiedztwa dla grafu przykłądowego: {timeStats.last('adj_list_file')} s")
+                    print(f"Czas wyliczania stopni wierzchołków: {timeStats.last('degrees_file')} s")
+                    print(f"Czas dodawania wierzchołka: {timeStats.last('add_vertex_file')} s")
+                    print(f"Czas wyliczania liczby anihilacji: {timeStats.last('annihilation_file')} s")
+                    print(f"Czas wyliczania potencjałów wierzchołków: {timeStats.last('potential_file')} s")
+                    UI_Instrumentation()
                     UI_LowLvL(int_input_graphType)
                 case 12:
                     input_file = str(input("Podaj nazwę pliku: "))
@@ -567,6 +3210,7 @@ Podaj odpowiednią cyfrę:
                 case 13:
                     UI_HighLvL()
         case 3:
+            graphCircle = load_circle_graph()
             print("""
 Wybierz akcję którą chcesz wykonać dla grafu kołowego:
 Podaj odpowiednią cyfrę:
@@ -575,7 +3219,8 @@ Podaj odpowiednią cyfrę:
 [3] Usuń koło
 [4] Narysuj graf
 [5] Zapisz graf do pliku
-[6] Zmień graf
+[6] Wypisz pomiary operacji na grafie
+[7] Zmień graf
 """)
             int_input_actionType = int(input())
             match(int_input_actionType):
@@ -606,10 +3251,71 @@ Podaj odpowiednią cyfrę:
                     print("Zapisano")
                     UI_HighLvL()
                 case 6:
+                    UI_Instrumentation()
+                    UI_LowLvL(int_input_graphType)
+                case 7:
                     print("Zmień graf.")
                     UI_HighLvL()   
         case 4:
             print("Koniec programu.")
             exit(0)
 
-UI_HighLvL()
\ No newline at end of file
+# Tryb wsadowy z wiersza poleceń albo testy wydajności (--benchmark); bez argumentów uruchamiane jest
+# interaktywne menu
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Metryki grafów dla wielu plików SNAP, binarnych CSR (.gcsr) "
+                                                 "i plików kół (.circles, .gcir oraz .txt z 4 kolumnami), "
+                                                 "wynik jako JSONL. Z --benchmark testy wydajności zapisywane "
+                                                 "do pliku JSON")
+    parser.add_argument("files", nargs="*", help="pliki lub wzorce glob, np. 'dane/*.snap'")
+    parser.add_argument("-m", "--metrics", default=",".join(BatchRunner.METRICS),
+                        help=f"metryki oddzielone przecinkami, dostępne: {','.join(BatchRunner.METRICS)}")
+    parser.add_argument("-l", "--path-length", type=int, default=3, help="długość ścieżek dla metryki paths")
+    parser.add_argument("-p", "--processes", type=int, default=None, help="liczba procesów, domyślnie liczba rdzeni")
+    parser.add_argument("-o", "--output", default=None, help="plik JSONL, domyślnie standardowe wyjście")
+    parser.add_argument("--engine", default="grid", choices=CircleGraph.ENGINES, help="silnik grafu kołowego")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="testy wydajności zamiast plików; wynik w pliku -o, domyślnie benchmark.json")
+    parser.add_argument("--baseline", default=None, metavar="FILE",
+                        help="poprzedni wynik --benchmark do porównania, regresje kończą program kodem 1")
+    parser.add_argument("--sizes", default=None,
+                        help="rozmiary grafów i zbiorów kół dla --benchmark oddzielone przecinkami")
+    parser.add_argument("--repeats", type=int, default=5, help="liczba powtórzeń każdego pomiaru dla --benchmark")
+    args = parser.parse_args(argv)
+    if args.benchmark:
+        return run_benchmark(parser, args)
+    if args.baseline is not None or args.sizes is not None:
+        parser.error("--baseline i --sizes wymagają --benchmark")
+    if not args.files:
+        parser.error("podaj pliki do przetworzenia albo --benchmark")
+    try:
+        runner = BatchRunner([metric.strip() for metric in args.metrics.split(",") if metric.strip()],
+                             args.path_length, args.engine)
+    except ValueError as error:
+        parser.error(str(error))
+    files = BatchRunner.expand_files(args.files)
+    if args.output is None:
+        errors = runner.run(files, args.processes)
+    else:
+        with open(args.output, "w") as output:
+            errors = runner.run(files, args.processes, output)
+    return 1 if errors else 0
+
+# Testy wydajności z wiersza poleceń - porównanie z --baseline przed zapisem, więc można wskazać ten sam plik
+def run_benchmark(parser, args):
+    if args.files:
+        parser.error("--benchmark nie przyjmuje plików")
+    try:
+        sizes = tuple(int(size) for size in args.sizes.split(",")) if args.sizes else None
+    except ValueError:
+        parser.error(f"Niepoprawne rozmiary: {args.sizes}")
+    suite = BenchmarkSuite(repeats=args.repeats) if sizes is None else BenchmarkSuite(sizes, sizes, args.repeats)
+    suite.run()
+    regressions = suite.compare_json(args.baseline) if args.baseline is not None else []
+    suite.save_json(args.output or "benchmark.json")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main())
+    UI_HighLvL()
\ No newline at end of file